@@ -13,6 +13,7 @@ os.makedirs(LOG_DIR, exist_ok=True)
 # Custom mapping: Python modules/files → Log names
 LOG_MODULE_MAP = {
     "apscheduler": "APPScheduler",
+    "chat_queue": "ChatQueue",
     "database": "Database",
     "event_queue_processor": "EventQueue",
     "function_registry": "FunctionRegistry",
@@ -63,6 +63,18 @@ PRINTER_CUPS_HOST = "192.168.10.5"
 PRINTER_IN_EP = 0x81
 PRINTER_OUT_EP = 0x02
 PRINTER_PROFILE = "TH230"
+PRINTER_WIDTH = 384  # Printable width in dots
+
+# Printer service
+PRINTER_JOB_HISTORY = 100  # Finished print jobs kept for the status API
+PRINTER_CAM_DELAY = 6  # Seconds the printer cam stays visible after a job (CUPS delay)
+PRINTER_STOP_TIMEOUT = 30  # Seconds to wait for the current job on shutdown
+PRINTER_JOB_TIMEOUT = 120  # Seconds a redemption waits for its print job
+
+# Print images (avatars), dithered and cached on disk by URL and printer width
+PRINTER_IMAGE_CACHE_DIR = "storage/print_images"
+PRINTER_IMAGE_CACHE_SIZE = 20 * 1024 * 1024  # Bytes, least recently used are evicted
+PRINTER_IMAGE_TIMEOUT = 10  # Seconds per image download
 
 if USE_MOCK_API:
     TWITCH_CLIENT_ID = "2b9b72c93c0154e624b6abdee104bc"
@@ -105,9 +117,107 @@ SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 SPOTIFY_REDIRECT_URI = "http://localhost:8000/spotify/auth"
 
+# Chat
+CHAT_MAX_MESSAGE_LENGTH = 500  # Twitch rejects longer messages
+CHAT_RATE_LIMIT = 20  # Messages per window (100 if the bot is mod/VIP)
+CHAT_RATE_WINDOW = 30  # Seconds
+CHAT_RATE_BURST = 5  # Messages that may be sent back-to-back
+
+# Event queue lanes (resource -> number of workers)
+EVENT_QUEUE_LANES = {
+    "printer": 1,  # One print job at a time
+    "obs": 1,  # OBS requests in order
+    "default": 4,  # Overlay, chat, heat clicks and rewards
+}
+
+# Longest time (seconds) a task class waits before it is served ahead of higher classes
+EVENT_QUEUE_MAX_WAIT = {
+    "alert": 2.0,
+    "background": 5.0,
+}
+
+# Journal of print jobs and reward tasks that survive restarts
+EVENT_QUEUE_JOURNAL_FILE = "storage/event_journal.sqlite3"
+EVENT_QUEUE_JOURNAL_COMPACT_EVERY = 100  # Acknowledged tasks between compactions
+EVENT_QUEUE_MAX_ATTEMPTS = 5  # Failed runs of a durable task before it is dropped
+EVENT_QUEUE_RETRY_DELAY = 30  # Seconds before a failed durable task is queued again
+
+# Longest time (seconds) a sequence waits for a queued function to finish
+SEQUENCE_STEP_TIMEOUT = 30
+
+# Default for sequences triggered while running: "replace", "ignore" or "parallel"
+SEQUENCE_RETRIGGER_POLICY = "replace"
+SEQUENCE_TRACE_LIMIT = 50  # Sequence runs kept for the trace view
+
+# Overlay alerts: seconds an alert occupies the overlay (matches the overlay animations)
+ALERT_DURATIONS = {
+    "follower": 7,
+    "subscriber": 6,
+    "subscription_message": 6,
+    "gift_sub": 6,
+    "raid": 27,
+    "cheer": 8,
+    "redemption": 7,
+    "default": 7,
+}
+
+# Lower values are shown first
+ALERT_PRIORITIES = {
+    "raid": 0,
+    "gift_sub": 1,
+    "subscriber": 2,
+    "subscription_message": 2,
+    "cheer": 2,
+    "redemption": 3,
+    "follower": 4,
+    "default": 5,
+}
+ALERT_GAP = 0.5  # Seconds between two alerts
+
+# Stream stats
+STREAM_STATS_TOP_N = 5  # Entries per ranking in the outro stats
+STREAM_STATS_REFRESH_INTERVAL = 5  # Seconds between snapshot rebuilds
+STREAM_STATS_PERSIST_INTERVAL = 60  # Seconds between database saves
+
+# Stream sessions
+STREAM_SESSION_POLL_INTERVAL = 60  # Seconds between stream state polls
+
+# EventSub duplicate detection
+EVENTSUB_DEDUP_FILE = "storage/eventsub_seen.json"
+EVENTSUB_DEDUP_TTL = 600  # Seconds a message id is remembered (retries come within 10 min)
+EVENTSUB_DEDUP_SIZE = 5000  # Message ids kept at most
+EVENTSUB_DEDUP_PERSIST_INTERVAL = 5  # Seconds between saves of the window
+
+# Heat API
+HEAT_API_URL = os.getenv("HEAT_API_URL", "wss://heat-api.j38.net/channel/{channel_id}")
+HEAT_API_BACKOFF_MIN = 1  # Seconds before the first reconnect
+HEAT_API_BACKOFF_MAX = 60  # Upper bound of the reconnect delay
+HEAT_API_PING_INTERVAL = 30  # Seconds between heartbeat pings
+HEAT_API_PING_TIMEOUT = 10  # Seconds to wait for a pong before reconnecting
+
+# Twitch user lookups (e.g. for Heat clicks)
+TWITCH_USER_CACHE_TTL = 3600  # Seconds a looked up user is cached
+TWITCH_USER_CACHE_SIZE = 5000  # Users cached at most
+TWITCH_USER_BATCH_WINDOW = 0.05  # Seconds cache misses are collected into one request
+
+# Overlay canvas and clickable object hit testing
+OVERLAY_WIDTH = 1920
+OVERLAY_HEIGHT = 1080
+SPATIAL_GRID_CELL_SIZE = 120  # Pixels per grid cell of the clickable object index
+
+# Click heatmap
+HEATMAP_CELL_SIZE = 20  # Pixels per heatmap cell (96x54 grid on 1920x1080)
+HEATMAP_HALF_LIFE = 30  # Seconds until a click counts half in the live heatmap
+HEATMAP_FRAME_INTERVAL = 0.5  # Seconds between heatmap frames sent to overlays
+
+# Seconds between file checks when file change events are unavailable
+FILE_WATCH_INTERVAL = 2
+
 # Additional settings
 TOKEN_FILE = "storage/twitch_tokens.json"
 SEQUENCES_FILE = "storage/sequences.yaml"
 STATE_FILE = "storage/state.json"
+STATE_WRITE_DELAY = 1  # Seconds condition changes are collected before saving
 COMMAND_RESPONSES_FILE = "storage/command_responses.json"
+HUB_FILTER_FILE = "storage/hub_filter.json"
 LOCAL_TIMEZONE = pytz.timezone("Europe/Berlin")
@@ -6,3 +6,5 @@ from .planets import *
 from .viewers import *
 from .admin_buttons import *
 from .scheduled_messages import *
+from .stream_stats import *
+from .streams import *
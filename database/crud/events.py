@@ -1,6 +1,7 @@
 import datetime
 import logging
 from database.couchdb_client import couchdb_client
+from modules.stream_session import stream_session
 
 logger = logging.getLogger("uvicorn.error.events")
 
@@ -15,6 +16,7 @@ def save_event(event_type: str, viewer_id: str = None, message: str = ""):
             "event_type": event_type,
             "viewer_id": viewer_id,
             "message": message,
+            "stream_id": stream_session.current_stream_id(),
             "timestamp": datetime.datetime.utcnow().isoformat(),
         }
         db.save(event)
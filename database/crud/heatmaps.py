@@ -0,0 +1,34 @@
+import datetime
+import logging
+from database.couchdb_client import couchdb_client
+
+logger = logging.getLogger("uvicorn.error.heatmap")
+
+
+def save_heatmap(stream_id: str, data: dict):
+    """Save or replace the click heatmap snapshot of a stream in CouchDB."""
+    try:
+        db = couchdb_client.get_db("heatmaps")
+        doc_id = f"heatmap_{stream_id}"
+
+        doc = db.get(doc_id) or {"_id": doc_id}
+        doc.update(data)
+        doc["type"] = "heatmap"
+        doc["stream_id"] = stream_id
+        doc["saved_at"] = datetime.datetime.utcnow().isoformat()
+
+        db.save(doc)
+        return doc
+    except Exception as e:
+        logger.error(f"❌ Error saving heatmap: {e}")
+        return None
+
+
+def get_heatmap(stream_id: str):
+    """Retrieve the click heatmap snapshot of a stream from CouchDB."""
+    try:
+        db = couchdb_client.get_db("heatmaps")
+        return db.get(f"heatmap_{stream_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve heatmap: {e}")
+        return None
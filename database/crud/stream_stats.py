@@ -0,0 +1,34 @@
+import datetime
+import logging
+from database.couchdb_client import couchdb_client
+
+logger = logging.getLogger("uvicorn.error.stream_stats")
+
+
+def save_stream_stats(stream_id: str, data: dict):
+    """Save or replace the aggregated chat stats of a stream in CouchDB."""
+    try:
+        db = couchdb_client.get_db("stream_stats")
+        doc_id = f"stream_stats_{stream_id}"
+
+        doc = db.get(doc_id) or {"_id": doc_id}
+        doc.update(data)
+        doc["type"] = "stream_stats"
+        doc["stream_id"] = stream_id
+        doc["saved_at"] = datetime.datetime.utcnow().isoformat()
+
+        db.save(doc)
+        return doc
+    except Exception as e:
+        logger.error(f"❌ Error saving stream stats: {e}")
+        return None
+
+
+def get_stream_stats(stream_id: str):
+    """Retrieve the aggregated chat stats of a stream from CouchDB."""
+    try:
+        db = couchdb_client.get_db("stream_stats")
+        return db.get(f"stream_stats_{stream_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve stream stats: {e}")
+        return None
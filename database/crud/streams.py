@@ -0,0 +1,27 @@
+import logging
+from database.couchdb_client import couchdb_client
+
+logger = logging.getLogger("uvicorn.error.streams")
+
+
+def save_stream_session(
+    session_id: str,
+    started_at: str,
+    ended_at: str = None,
+    twitch_stream_id: str = None,
+):
+    """Create or update a stream session in CouchDB."""
+    try:
+        db = couchdb_client.get_db("streams")
+
+        doc = db.get(session_id) or {"_id": session_id, "type": "stream"}
+        doc["started_at"] = started_at
+        doc["ended_at"] = ended_at
+        doc["twitch_stream_id"] = twitch_stream_id or doc.get("twitch_stream_id")
+
+        db.save(doc)
+        return doc
+    except Exception as e:
+        logger.error(f"❌ Error saving stream session: {e}")
+        return None
+
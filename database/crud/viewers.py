@@ -113,7 +113,11 @@ def update_viewer_stats(
         if is_reply:
             viewer["total_replies"] = viewer.get("total_replies", 0) + 1
 
-        # Per-stream statistics
+        # Per-stream statistics (only while a stream session is running)
+        if not stream_id:
+            db.save(viewer)
+            return db[doc_id]
+
         stream_stats = viewer.get("stream_stats", [])
         stream_record = next(
             (stat for stat in stream_stats if stat["stream_id"] == stream_id), None
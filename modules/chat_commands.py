@@ -3,6 +3,7 @@ import json
 import os
 import config
 from fastapi.responses import HTMLResponse
+from modules.misc import atomic_write_json
 from modules.websocket_handler import broadcast_message
 from database.crud.todos import save_todo, get_todos
 from modules.openai import generate_tts_audio, delete_tts_file, get_mp3_duration
@@ -12,25 +13,64 @@ logger = logging.getLogger("uvicorn.error.chat_commands")
 
 COMMAND_RESPONSES_FILE = config.COMMAND_RESPONSES_FILE
 COMMANDS = {}
+COMMAND_RESPONSES = {}
 ALIASES = {}
 
-# Load responses from file (if exists)
-if os.path.exists(COMMAND_RESPONSES_FILE):
-    with open(COMMAND_RESPONSES_FILE, "r", encoding="utf-8") as f:
-        COMMAND_RESPONSES = json.load(f)
-else:
-    COMMAND_RESPONSES = {}
 
-for cmd, data in COMMAND_RESPONSES.items():
-    if isinstance(data, dict) and "aliases" in data:
-        for alias in data["aliases"]:
-            ALIASES[alias] = cmd  # Map alias to main command
+def load_command_responses(path: str = COMMAND_RESPONSES_FILE):
+    """
+    Read and validate the command responses file.
+
+    Returns `(responses, aliases)` and raises ValueError if the file is invalid.
+    """
+    if not os.path.exists(path):
+        return {}, {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("command responses must be an object")
+
+    responses = {}
+    aliases = {}
+    for cmd, entry in data.items():
+        # Older !addresponse versions stored the plain response text
+        if isinstance(entry, str):
+            entry = {"response": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("response"), str):
+            raise ValueError(f"!{cmd} needs a 'response' text")
+
+        entry_aliases = entry.get("aliases", [])
+        if not isinstance(entry_aliases, list):
+            raise ValueError(f"aliases of !{cmd} must be a list")
+
+        responses[cmd] = entry
+        for alias in entry_aliases:
+            aliases[alias] = cmd  # Map alias to main command
+
+    return responses, aliases
+
+
+def reload_command_responses():
+    """Reload the command responses, keeping the current ones if the file is invalid."""
+    global COMMAND_RESPONSES, ALIASES
+    try:
+        COMMAND_RESPONSES, ALIASES = load_command_responses()
+        logger.info(f"🔄 Loaded {len(COMMAND_RESPONSES)} command responses.")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to load command responses: {e}")
+        return False
 
 
 def save_command_responses():
     """Save COMMAND_RESPONSES to JSON file."""
-    with open(COMMAND_RESPONSES_FILE, "w", encoding="utf-8") as f:
-        json.dump(COMMAND_RESPONSES, f, indent=4)
+    atomic_write_json(COMMAND_RESPONSES_FILE, COMMAND_RESPONSES)
+
+
+# Load responses on startup
+reload_command_responses()
 
 
 def check_access_rights(event, level: str):
@@ -136,7 +176,7 @@ async def command_addresponse(bot, params: str, event):
             )
             return
 
-        COMMAND_RESPONSES[command_name] = response_text
+        COMMAND_RESPONSES[command_name] = {"response": response_text}
         save_command_responses()
         await bot.send_message(f"✅ Command !{command_name} added.")
 
@@ -197,25 +237,8 @@ async def command_todos(bot, params: str, event):
 
     todo_list = [f"- {todo['text']} (by {todo['username']})" for todo in todos]
 
-    # Send in chunks (Twitch chat limit: ~500 chars per message)
-    message = "📝 **Aktuelle ToDos:**\n\n" + "\n\n".join(todo_list)
-    if len(message) > 500:
-        chunks = []
-        current_chunk = "📝 **Aktuelle ToDos:**\n"
-
-        for todo in todo_list:
-            if len(current_chunk) + len(todo) + 2 > 500:  # +2 for newline and safety
-                chunks.append(current_chunk.strip())
-                current_chunk = ""
-
-            current_chunk += todo + "\n"
-
-        chunks.append(current_chunk.strip())  # Add the last chunk
-
-        for chunk in chunks:
-            await bot.send_message(chunk)
-    else:
-        await bot.send_message(message)
+    # The chat queue splits this into Twitch-sized messages
+    await bot.send_message("📝 Aktuelle ToDos: " + " ".join(todo_list))
 
 
 COMMANDS["todos"] = command_todos
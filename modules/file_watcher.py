@@ -0,0 +1,93 @@
+import asyncio
+import inspect
+import logging
+import os
+
+import config
+
+try:
+    from watchfiles import awatch  # Installed with uvicorn[standard]
+except ImportError:
+    awatch = None
+
+logger = logging.getLogger("uvicorn.error.file_watcher")
+
+
+class FileWatcher:
+    """
+    Calls a reload function when a watched file changes.
+
+    Uses inotify (via watchfiles) where available and falls back to polling
+    modification times. The reload functions are responsible for validating
+    the new contents and keeping the last good version if they are invalid.
+    """
+
+    def __init__(self, poll_interval: float = config.FILE_WATCH_INTERVAL):
+        self.poll_interval = poll_interval
+        self.callbacks = {}
+        self._task = None
+
+    def watch(self, path: str, callback):
+        """Call `callback()` (sync or async) whenever `path` changes."""
+        self.callbacks.setdefault(os.path.abspath(path), []).append(callback)
+
+    async def _reload(self, path: str):
+        logger.info(f"🔄 {os.path.relpath(path)} changed, reloading...")
+        for callback in self.callbacks.get(path, []):
+            try:
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ Reloading {path} failed: {e}")
+
+    async def _run_inotify(self):
+        # Watch the directories, editors often replace files instead of writing them
+        directories = {os.path.dirname(path) for path in self.callbacks}
+        async for changes in awatch(*directories):
+            for path in sorted({os.path.abspath(p) for _, p in changes}):
+                if path in self.callbacks and os.path.exists(path):
+                    await self._reload(path)
+
+    def _stat(self, path: str):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    async def _run_polling(self):
+        known = {path: self._stat(path) for path in self.callbacks}
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path, previous in known.items():
+                current = self._stat(path)
+                if current and current != previous:
+                    known[path] = current
+                    await self._reload(path)
+
+    async def run(self):
+        if awatch:
+            try:
+                logger.info(f"👀 Watching {len(self.callbacks)} files for changes")
+                await self._run_inotify()
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ File events unavailable ({e}), polling instead")
+
+        logger.info(
+            f"👀 Polling {len(self.callbacks)} files every {self.poll_interval}s"
+        )
+        await self._run_polling()
+
+    def start(self):
+        if not self._task and self.callbacks:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+file_watcher = FileWatcher()
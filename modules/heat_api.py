@@ -1,122 +1,195 @@
 import asyncio
 import json
 import logging
+import random
+import time
 import websockets
+import config
 from modules.schemas import ClickableObject
+from modules.queues.priority_queue import INTERACTIVE
+from modules.queues.tasks import HeatClickTask
+from modules.spatial_index import SpatialGrid
+from modules.heatmap import heatmap
+from modules.state_manager import (
+    save_clickable,
+    delete_clickable,
+    replace_clickables,
+    get_saved_clickables,
+)
+from modules.websocket_handler import broadcast_message
 
 logger = logging.getLogger("uvicorn.error.heat")
 
-# Dynamic dictionary for clickable objects (Updated via API)
+# Dynamic dictionary for clickable objects (Updated via API, saved in state.json)
 CLICKABLE_OBJECTS = {}
 
+# Spatial index over CLICKABLE_OBJECTS for hit testing
+CLICKABLE_INDEX = SpatialGrid()
+
 
 class HeatAPIClient:
     """
     Connects to Twitch Heat API WebSocket and processes user clicks.
+
+    A single supervisor task owns the connection: it reconnects with
+    exponential backoff and jitter after any failure and runs a heartbeat task
+    per connection, which closes a connection that stops answering pings.
+    Stopping cancels the supervisor together with its heartbeat.
     """
 
-    def __init__(self, app, channel_id: int):
+    def __init__(self, app, channel_id: int, url: str = None):
         """
         Initialize the Heat API client.
 
+        :param app: FastAPI app whose event queue receives the clicks.
         :param channel_id: Twitch Channel ID for Heat API.
-        :param event_queue: asyncio.Queue to store events.
+        :param url: WebSocket URL, `config.HEAT_API_URL` by default.
         """
         self.channel_id = channel_id
-        self.is_connected = False
-        self.event_queue = app.state.event_queue.get()
-        self.websocket_task = None
-        self.heat_api_url = f"wss://heat-api.j38.net/channel/{self.channel_id}"
-
-    async def connect(self):
-        """Connects to the Twitch Heat API WebSocket and sends data to connected clients."""
+        self.event_queue = app.state.event_queue
+        self.heat_api_url = (url or config.HEAT_API_URL).format(channel_id=channel_id)
+        self.state = "stopped"
+        self.connects = 0
+        self.failures = 0
+        self.messages = 0
+        self.clicks = 0
+        self.last_error = None
+        self.connected_since = None
+        self.ping_latency = None
+        self._task = None
+
+    @property
+    def is_connected(self):
+        return self.state == "connected"
+
+    async def run(self):
+        """Keep one connection to the Heat API open until stopped."""
+        failures = 0
         while True:
+            self.state = "connecting"
             try:
                 logger.info(f"🔗 Connecting to Heat API WebSocket: {self.heat_api_url}")
-
                 async with websockets.connect(
-                    self.heat_api_url, ping_interval=30
-                ) as ws:  # Ping alle 30 Sekunden
+                    self.heat_api_url, ping_interval=None
+                ) as ws:
                     logger.info(
                         f"✅ Connected to Heat API for channel {self.channel_id}"
                     )
-
-                    # Start background ping task
-                    asyncio.create_task(self.send_ping(ws))
-                    self.is_connected = True
-
-                    while True:
-                        message = await ws.recv()
-                        data = json.loads(message)
-
-                        # Log received data
-                        logger.debug(f"🔥 Heat API Data: {data}")
-
-                        if data.get("type") == "system":
-                            continue
-                        elif data.get("type") == "click":
-                            # Ignore anonymous or unverified users
-                            user_id = data.get("id")
-
-                            # We need to multiply with the canvas size
-                            coord_x = int(float(data.get("x")) * 1920)
-                            coord_y = int(float(data.get("y")) * 1080)
-
-                            logger.debug(
-                                f"🔥 user: {user_id} | x: {coord_x} | y: {coord_y}"
-                            )
-
-                            if user_id.startswith("A") or user_id.startswith("U"):
-                                username = (
-                                    "Anonymous"
-                                    if user_id.startswith("A")
-                                    else "Unverified"
-                                )
-                                logger.debug(f"⚠️ Got click from {username}")
-
-                            # Detect what object was clicked
-                            processed_click = process_click(data, coord_x, coord_y)
-                            logger.info(f"Clicked Object: {processed_click}")
-
-                            # Send verified user clicks to the FastAPI queue
-                            await self.event_queue.put(processed_click)
-
-            except (websockets.exceptions.ConnectionClosed, asyncio.TimeoutError) as e:
-                logger.error(
-                    f"❌ WebSocket connection error: {e}. Retrying in 5 seconds..."
-                )
-                await asyncio.sleep(5)  # Retry after delay
+                    self.state = "connected"
+                    self.connects += 1
+                    self.connected_since = time.time()
+                    failures = 0
+
+                    heartbeat = asyncio.create_task(self.heartbeat(ws))
+                    try:
+                        async for message in ws:
+                            await self.handle_message(message)
+                    finally:
+                        heartbeat.cancel()
+                        await asyncio.gather(heartbeat, return_exceptions=True)
+
+                self.last_error = "connection closed"
+                logger.warning("⚠️ Heat API closed the connection")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Heat API connection error: {e}")
+
+            self.state = "backoff"
+            self.connected_since = None
+            self.failures += 1
+            failures += 1
+            delay = min(
+                config.HEAT_API_BACKOFF_MAX,
+                config.HEAT_API_BACKOFF_MIN * 2 ** (failures - 1),
+            )
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            logger.info(f"🔁 Reconnecting to Heat API in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def heartbeat(self, ws):
+        """Ping the server periodically; close the connection if it stops answering."""
+        while True:
+            await asyncio.sleep(config.HEAT_API_PING_INTERVAL)
+            try:
+                started = time.monotonic()
+                pong_waiter = await ws.ping()
+                await asyncio.wait_for(pong_waiter, config.HEAT_API_PING_TIMEOUT)
+                self.ping_latency = time.monotonic() - started
+                logger.debug("📡 Heat API ping answered")
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"❌ Unexpected WebSocket error: {e}")
-                await asyncio.sleep(5)  # Retry in case of unexpected failure
+                logger.warning(f"⚠️ Heat API ping failed: {e}")
+                await ws.close()
+                return
 
-    async def send_ping(self, ws):
-        """Send periodic ping messages to keep the connection alive."""
+    async def handle_message(self, message):
+        self.messages += 1
         try:
-            while True:
-                await asyncio.sleep(120)  # Send ping every 120 seconds
-                await ws.ping()
-                logger.debug("📡 Sent WebSocket ping to Heat API")
-                self.is_connected = True
-        except Exception as e:
-            logger.warning(f"⚠️ Ping failed: {e}")
-            self.is_connected = False
-            await self.connect()
+            data = json.loads(message)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid Heat API message: {message!r}")
+            return
+
+        # Log received data
+        logger.debug(f"🔥 Heat API Data: {data}")
+
+        if data.get("type") == "click":
+            await self.handle_click(data)
+
+    async def handle_click(self, data: dict):
+        self.clicks += 1
+        user_id = data.get("id")
+
+        # We need to multiply with the canvas size
+        coord_x = int(float(data.get("x")) * config.OVERLAY_WIDTH)
+        coord_y = int(float(data.get("y")) * config.OVERLAY_HEIGHT)
+
+        logger.debug(f"🔥 user: {user_id} | x: {coord_x} | y: {coord_y}")
+
+        heatmap.add_click(coord_x, coord_y)
+
+        # Detect what object was clicked
+        processed_click = process_click(data, coord_x, coord_y)
+        logger.debug(f"Clicked Object: {processed_click}")
+
+        # Only clicks on an object need handling
+        if processed_click.object_id is None:
+            return
+
+        await self.event_queue.put(processed_click, INTERACTIVE)
 
     def start(self):
         """Starts the WebSocket listener asynchronously."""
-        if not self.websocket_task:
-            self.websocket_task = asyncio.create_task(self.connect())
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
             logger.info(f"🚀 Heat API listener started for channel {self.channel_id}.")
 
-    def stop(self):
-        """Stops the WebSocket listener."""
-        if self.websocket_task:
-            self.websocket_task.cancel()
-            self.websocket_task = None
-            self.is_connected = False
+    async def stop(self):
+        """Stops the WebSocket listener and waits until the connection is closed."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self.state = "stopped"
+            self.connected_since = None
             logger.info(f"🛑 Heat API listener stopped for channel {self.channel_id}.")
 
+    def stats(self):
+        return {
+            "state": self.state,
+            "url": self.heat_api_url,
+            "connected_since": self.connected_since,
+            "connects": self.connects,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "ping_latency": self.ping_latency,
+            "messages": self.messages,
+            "clicks": self.clicks,
+        }
+
 
 def process_click(data, x, y):
     """Detect if a user clicked on a dynamically registered object."""
@@ -124,23 +197,9 @@ def process_click(data, x, y):
 
     logger.debug(f"Searching for object at {x} : {y}")
 
-    clicked_object = None
-    for obj_name, obj_data in CLICKABLE_OBJECTS.items():
-        if (
-            obj_data["x"] <= x <= obj_data["x"] + obj_data["width"]
-            and obj_data["y"] <= y <= obj_data["y"] + obj_data["height"]
-        ):
-            clicked_object = obj_name
-            break
-
-    return {
-        "heat_click": {
-            "user_id": user_id,
-            "x": x,
-            "y": y,
-            "object_id": clicked_object,
-        }
-    }
+    clicked_object = CLICKABLE_INDEX.hit(x, y)
+
+    return HeatClickTask(user_id=user_id, x=x, y=y, object_id=clicked_object)
 
 
 async def add_clickable_object(obj: ClickableObject):
@@ -156,7 +215,8 @@ async def add_clickable_object(obj: ClickableObject):
 
     # Store the object as a dictionary instead of a Pydantic model
     CLICKABLE_OBJECTS[object_id] = obj.model_dump()
-    update_clickable_objects(CLICKABLE_OBJECTS)
+    index_clickable_object(CLICKABLE_OBJECTS[object_id])
+    save_clickable(object_id, CLICKABLE_OBJECTS[object_id])
 
     logger.info(f"✅ Clickable object '{object_id}' added")
     return {"status": "success", "message": f"Clickable object '{object_id}' added"}
@@ -169,19 +229,54 @@ async def remove_clickable_object(object_id: str):
         return {"status": "error", "message": f"Clickable object {object_id} not found"}
 
     removed_obj = CLICKABLE_OBJECTS.pop(object_id)
-    update_clickable_objects(CLICKABLE_OBJECTS)
+    CLICKABLE_INDEX.remove(object_id)
+    delete_clickable(object_id)
 
     logger.info(f"🗑️ Clickable object '{object_id}' removed: {removed_obj}")
     return {"status": "success", "message": f"Clickable object '{object_id}' removed"}
 
 
-def update_clickable_objects(new_objects: dict):
+def update_clickable_objects(new_objects: dict, persist: bool = True):
     """Update the currently active clickable objects."""
     global CLICKABLE_OBJECTS
     CLICKABLE_OBJECTS = new_objects
-    logger.info(f"🔄 Clickable objects updated: {CLICKABLE_OBJECTS}")
+
+    CLICKABLE_INDEX.clear()
+    for obj_data in CLICKABLE_OBJECTS.values():
+        index_clickable_object(obj_data)
+
+    if persist:
+        replace_clickables(CLICKABLE_OBJECTS)
+
+    logger.info(f"🔄 Clickable objects updated: {len(CLICKABLE_OBJECTS)} objects")
+    logger.debug(f"🔄 Clickable objects: {CLICKABLE_OBJECTS}")
+
+
+def index_clickable_object(obj_data: dict):
+    """Add a stored clickable object to the hit test index."""
+    CLICKABLE_INDEX.add(
+        obj_data["object_id"],
+        obj_data["x"],
+        obj_data["y"],
+        obj_data["width"],
+        obj_data["height"],
+        obj_data.get("z", 0),
+    )
 
 
 def get_clickable_objects():
     """Retrieve all currently defined clickable objects."""
     return CLICKABLE_OBJECTS
+
+
+async def restore_clickable_objects():
+    """Restore the saved clickable objects and show them on connected overlays."""
+    saved = get_saved_clickables()
+    update_clickable_objects(saved, persist=False)
+
+    for obj_data in saved.values():
+        await broadcast_message({"clickable": {**obj_data, "action": "add"}})
+
+    if saved:
+        logger.info(f"♻️ Restored {len(saved)} clickable objects")
+    return saved
@@ -0,0 +1,197 @@
+import asyncio
+import base64
+import logging
+import time
+import zlib
+
+import numpy as np
+
+import config
+from database.crud.heatmaps import save_heatmap, get_heatmap
+from modules.websocket_handler import get_subscribers, send_to_subscribers
+
+logger = logging.getLogger("uvicorn.error.heatmap")
+
+
+def encode_grid(grid: np.ndarray) -> str:
+    """Compress a grid for JSON (zlib, base64)."""
+    return base64.b64encode(zlib.compress(grid.tobytes())).decode("ascii")
+
+
+def decode_grid(data: str, dtype, shape) -> np.ndarray:
+    raw = zlib.decompress(base64.b64decode(data))
+    return np.frombuffer(raw, dtype=dtype).reshape(shape)
+
+
+class HeatmapAccumulator:
+    """
+    Click heatmap of the overlay at reduced resolution.
+
+    Clicks are only buffered when they arrive and added to the grid in one
+    vectorized step per frame, so the cost per frame does not depend on the
+    number of clicks. The live grid decays exponentially (`half_life`) and is
+    sent as a compressed 8-bit frame to the overlays that subscribed to
+    "heatmap", only when it changed; a second, undecayed grid counts all
+    clicks of the stream and is saved when it ends. Clicks from before a
+    session started count towards that session.
+    """
+
+    def __init__(
+        self,
+        width: int = config.OVERLAY_WIDTH,
+        height: int = config.OVERLAY_HEIGHT,
+        cell_size: int = config.HEATMAP_CELL_SIZE,
+        half_life: float = config.HEATMAP_HALF_LIFE,
+        frame_interval: float = config.HEATMAP_FRAME_INTERVAL,
+    ):
+        self.cell_size = cell_size
+        self.columns = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.half_life = half_life
+        self.frame_interval = frame_interval
+        self.grid = np.zeros((self.rows, self.columns), dtype=np.float32)
+        self.totals = np.zeros((self.rows, self.columns), dtype=np.uint32)
+        self.stream_id = None
+        self.clicks = 0
+        self.frames = 0
+        self._pending_x = []
+        self._pending_y = []
+        self._last_update = time.monotonic()
+        self._task = None
+
+    def add_click(self, x: int, y: int):
+        """Buffer a click in overlay pixels until the next frame."""
+        self._pending_x.append(x)
+        self._pending_y.append(y)
+
+    def ingest(self):
+        """Decay the live grid and add all buffered clicks."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        if self.half_life:
+            self.grid *= np.float32(0.5 ** (elapsed / self.half_life))
+
+        if not self._pending_x:
+            return 0
+
+        xs, self._pending_x = self._pending_x, []
+        ys, self._pending_y = self._pending_y, []
+        columns = np.clip(np.asarray(xs) // self.cell_size, 0, self.columns - 1)
+        rows = np.clip(np.asarray(ys) // self.cell_size, 0, self.rows - 1)
+        counts = np.bincount(
+            rows * self.columns + columns, minlength=self.grid.size
+        ).reshape(self.grid.shape)
+
+        self.grid += counts
+        self.totals += counts.astype(np.uint32)
+        self.clicks += len(xs)
+        return len(xs)
+
+    def frame(self):
+        """Return the live grid scaled to 0-255, or None if it is empty."""
+        peak = float(self.grid.max())
+        if peak < 0.01:
+            return None
+
+        scaled = np.rint(self.grid * (255 / peak)).astype(np.uint8)
+        return {
+            "width": self.columns,
+            "height": self.rows,
+            "cell_size": self.cell_size,
+            "peak": round(peak, 2),
+            "data": encode_grid(scaled),
+        }
+
+    def snapshot(self):
+        """Return all clicks of the current stream per cell."""
+        return {
+            "width": self.columns,
+            "height": self.rows,
+            "cell_size": self.cell_size,
+            "clicks": int(self.totals.sum()),
+            "peak": int(self.totals.max()),
+            "dtype": "uint32",
+            "data": encode_grid(self.totals),
+        }
+
+    def reset(self, stream_id=None):
+        self.grid.fill(0)
+        self.totals.fill(0)
+        self._pending_x, self._pending_y = [], []
+        self.stream_id = stream_id
+
+    def persist(self):
+        """Save the snapshot of the current stream to CouchDB."""
+        self.ingest()
+        if self.stream_id and self.totals.any():
+            save_heatmap(self.stream_id, self.snapshot())
+            logger.info(f"💾 Saved click heatmap of stream {self.stream_id}")
+
+    def restore(self, doc: dict):
+        """Continue the snapshot of a stream saved before a restart."""
+        if not doc or (doc.get("height"), doc.get("width")) != self.totals.shape:
+            return
+
+        self.totals += decode_grid(doc["data"], doc["dtype"], self.totals.shape)
+        logger.info(f"✅ Restored click heatmap of stream {self.stream_id}")
+
+    def on_session(self, session: dict):
+        """Stream session listener: save the finished stream and start over."""
+        if session.get("ended_at"):
+            self.persist()
+            self.reset()
+        elif session["_id"] != self.stream_id:
+            if self.stream_id:
+                self.persist()
+                self.reset()
+            self.stream_id = session["_id"]
+            self.restore(get_heatmap(self.stream_id))
+
+    async def run(self):
+        sent_data = None
+        sent_to = set()
+        while True:
+            await asyncio.sleep(self.frame_interval)
+            try:
+                self.ingest()
+                subscribers = get_subscribers("heatmap")
+                if not subscribers:
+                    sent_to = set()
+                    continue
+
+                # Decay scales the whole grid, so the 8-bit frame often stays equal
+                frame = self.frame()
+                data = frame["data"] if frame else None
+                if data == sent_data and subscribers <= sent_to:
+                    continue
+
+                await send_to_subscribers(
+                    "heatmap", {"heatmap": frame or {"clear": True}}
+                )
+                sent_data, sent_to = data, subscribers
+                self.frames += 1
+            except Exception as e:
+                logger.error(f"❌ Failed to send heatmap frame: {e}")
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+            logger.info("🚀 Heatmap accumulator started.")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.persist()
+
+    def stats(self):
+        return {
+            "stream_id": self.stream_id,
+            "clicks": self.clicks,
+            "pending": len(self._pending_x),
+            "frames": self.frames,
+        }
+
+
+heatmap = HeatmapAccumulator()
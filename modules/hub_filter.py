@@ -0,0 +1,141 @@
+import json
+import logging
+import re
+from collections import deque
+
+import config
+
+logger = logging.getLogger("uvicorn.error.hub_filter")
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase `text` without changing its length, so indexes still point into
+    the original text. Characters whose lowercase form is longer (e.g. "İ")
+    are kept as they are.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(
+        lower if len(lower := char.lower()) == 1 else char for char in text
+    )
+
+
+class WordFilter:
+    """
+    Single-pass word filter for the hub text.
+
+    `words` are matched case-insensitively anywhere in the text with an
+    Aho–Corasick automaton, so a lookup is linear in the text length no matter
+    how many words are configured. `prefix_patterns` are regexes that are only
+    tried once at the start of the text.
+    """
+
+    def __init__(self, words, prefix_patterns=None):
+        self.words = sorted({fold_case(word) for word in words if word})
+        self.prefix = (
+            re.compile("|".join(f"(?:{p})" for p in prefix_patterns), re.IGNORECASE)
+            if prefix_patterns
+            else None
+        )
+        self._build(self.words)
+
+    def _build(self, words):
+        # Trie as parallel lists: transitions, failure links, matched word (or None)
+        goto = [{}]
+        output = [None]
+
+        for word in words:
+            state = 0
+            for char in word:
+                if char not in goto[state]:
+                    goto.append({})
+                    output.append(None)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            output[state] = word
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(char, 0)
+                if fail[child] == child:
+                    fail[child] = 0
+                # Inherit matches that end here through the failure link
+                if output[child] is None:
+                    output[child] = output[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find(self, text: str):
+        """Return the first offending word in `text`, or None."""
+        if self.prefix:
+            match = self.prefix.match(text)
+            if match:
+                return match.group(0)
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+
+        for index, char in enumerate(fold_case(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if output[state] is not None:
+                return self._surrounding_word(text, index, len(output[state]))
+
+        return None
+
+    @staticmethod
+    def _surrounding_word(text: str, end: int, length: int):
+        """Expand a match to the whole word it is part of (for logging)."""
+        start = end - length + 1
+        end += 1
+        while start > 0 and (text[start - 1].isalnum() or text[start - 1] == "_"):
+            start -= 1
+        while end < len(text) and (text[end].isalnum() or text[end] == "_"):
+            end += 1
+        return text[start:end]
+
+
+def load_word_filter(path: str = config.HUB_FILTER_FILE) -> WordFilter:
+    """Load and compile the word filter from a JSON file."""
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    return WordFilter(data.get("words", []), data.get("prefix_patterns", []))
+
+
+HUB_FILTER = WordFilter([])
+
+
+def reload_hub_filter():
+    """Reload the hub filter, keeping the current one if the file is invalid."""
+    global HUB_FILTER
+    try:
+        HUB_FILTER = load_word_filter()
+        logger.info(f"🔄 Hub filter loaded with {len(HUB_FILTER.words)} words.")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to load hub filter: {e}")
+        return False
+
+
+def get_hub_filter() -> WordFilter:
+    """Return the currently active hub filter."""
+    return HUB_FILTER
+
+
+# ✅ Load the filter on startup
+reload_hub_filter()
@@ -6,24 +6,50 @@ import os
 from modules.twitch_api import TwitchAPI
 from modules.twitch_chat import TwitchChatBot
 from modules.obs_api import OBSController
-from modules.heat_api import HeatAPIClient
-from modules.printer_manager import PrinterManager
-from modules.sequence_runner import load_sequences
+from modules.heat_api import HeatAPIClient, restore_clickable_objects
+from modules.heatmap import heatmap
+from modules.printer_service import printer_service
 from modules.queues.manager import event_queue, alert_queue
+from modules.queues.journal import TaskJournal, replay_journal
 from modules.queues.function_registry import register_function
 from modules.apscheduler import start_scheduler, shutdown_scheduler, load_scheduled_jobs
 from modules.queues.event_processor import process_event_queue
-from modules.queues.alert_processor import process_alert_queue
+from modules.stream_stats import stream_stats
+from modules.stream_session import stream_session
+from modules.file_watcher import file_watcher
+from modules.chat_commands import reload_command_responses
+from modules.hub_filter import reload_hub_filter
 
 from routes.overlay import send_to_overlay
 from modules.sequence_runner import reload_sequences
+from modules.state_manager import save_states
 from routes.print import print_data
 
 logger = logging.getLogger("uvicorn.error.lifespan")
 
 # Global Modules
-printer_manager = PrinterManager()
+task_journal = TaskJournal()
 heat_api_client = None
+event_processor_task = None
+
+
+async def replay_when_ready(twitch_api, twitch_startup):
+    """Replay unfinished journaled tasks once the Twitch API is initialized."""
+    try:
+        await twitch_startup
+    except Exception as e:
+        logger.error(f"❌ Twitch API startup failed: {e}")
+
+    if not twitch_api.is_running:
+        logger.warning("⚠️ Twitch API not running, journaled tasks are kept")
+        return
+    if task_journal.db is None:
+        return
+
+    try:
+        replay_journal(task_journal, event_queue)
+    except Exception as e:
+        logger.error(f"❌ Could not replay the event queue journal: {e}")
 
 
 @asynccontextmanager
@@ -54,19 +80,20 @@ async def lifespan(app):
         app.state.event_queue = event_queue
         app.state.alert_queue = alert_queue
 
-        # Initialize Printer
-        if not config.DISABLE_PRINTER:
-            printer_manager.initialize()
-            app.state.printer = printer_manager
-        else:
-            logger.info("🚫 Printer is disabled.")
-            app.state.printer = None
+        # Record print jobs and reward tasks, so they survive a restart
+        try:
+            task_journal.open()
+            task_journal.compact()
+            event_queue.attach_journal(task_journal)
+        except Exception as e:
+            logger.error(f"❌ Event queue journal unavailable: {e}")
 
         # Initialize Heat API
         if not config.DISABLE_HEAT_API and not use_mock_api:
             global heat_api_client
             heat_api_client = HeatAPIClient(app, config.TWITCH_CHANNEL_ID)
             heat_api_client.start()
+            heatmap.start()
             app.state.heat_api = heat_api_client
         else:
             logger.info("🚫 Heat API is disabled.")
@@ -74,7 +101,9 @@ async def lifespan(app):
 
         # Initialize Twitch API & Chat
         if not config.DISABLE_TWITCH:
-            asyncio.create_task(twitch_api.initialize(app))
+            twitch_startup = asyncio.create_task(twitch_api.initialize(app))
+            # Journaled tasks all need Twitch (redemptions, rewards)
+            asyncio.create_task(replay_when_ready(twitch_api, twitch_startup))
             if not use_mock_api:
                 asyncio.create_task(twitch_chat.start_chat(app))
             app.state.twitch_api = twitch_api
@@ -96,22 +125,48 @@ async def lifespan(app):
             )
             await obs.initialize()
             app.state.obs = obs
-            register_function("obs.toggle_source", obs.toggle_source)
-            register_function("obs.switch_scene", obs.switch_scene)
+            register_function("obs.toggle_source", obs.toggle_source, lane="obs")
+            register_function("obs.switch_scene", obs.switch_scene, lane="obs")
         else:
             logger.info("🚫 OBS API is disabled.")
             app.state.obs = None
 
-        # Load Sequences
-        load_sequences()
+        # Initialize Printer (on its own thread, shows the printer cam via OBS)
+        if not config.DISABLE_PRINTER:
+            printer_service.start(obs)
+            app.state.printer = printer_service
+        else:
+            logger.info("🚫 Printer is disabled.")
+            app.state.printer = None
 
         register_function("send_to_overlay", send_to_overlay)
         register_function("reload_sequences", reload_sequences)
-        register_function("print_data", print_data)
+        register_function("print_data", print_data, lane="printer")
 
         # Start queue processors once
-        asyncio.create_task(process_event_queue(app))
-        # asyncio.create_task(process_alert_queue(app))
+        global event_processor_task
+        event_processor_task = asyncio.create_task(process_event_queue(app))
+        stream_stats.start()
+
+        # Track stream sessions (EventSub with polling fallback)
+        stream_session.add_listener(
+            lambda session: stream_stats.switch_stream(
+                None if session.get("ended_at") else session["_id"]
+            )
+        )
+        stream_session.add_listener(heatmap.on_session)
+        if not config.DISABLE_TWITCH:
+            stream_session.start(twitch_api)
+        alert_queue.start()
+
+        # Clickable objects from before the restart
+        await restore_clickable_objects()
+
+        # Hot reload of file based configuration
+        file_watcher.watch(config.SEQUENCES_FILE, reload_sequences)
+        file_watcher.watch(config.COMMAND_RESPONSES_FILE, reload_command_responses)
+        file_watcher.watch(config.HUB_FILTER_FILE, reload_hub_filter)
+        file_watcher.start()
 
         await asyncio.sleep(1)
 
@@ -119,15 +174,34 @@ async def lifespan(app):
     finally:
         logger.info("🔻 Shutting Down Modules...")
 
-        if not config.DISABLE_PRINTER:
-            printer_manager.shutdown()
+        # Producers of event queue tasks first
+        file_watcher.stop()
+        alert_queue.stop()
+        stream_session.stop()
 
         if not config.DISABLE_HEAT_API and heat_api_client:
-            heat_api_client.stop()
+            await heat_api_client.stop()
+            heatmap.stop()
 
         if not config.DISABLE_TWITCH and twitch_chat:
             await twitch_chat.stop()
             shutdown_scheduler()
 
+        # Finish the current print job, then stop the queue workers. Twitch is
+        # still up to fulfil its redemption and the journal to acknowledge it.
+        if not config.DISABLE_PRINTER:
+            await asyncio.to_thread(printer_service.stop)
+
+        if event_processor_task:
+            event_processor_task.cancel()
+            await asyncio.gather(event_processor_task, return_exceptions=True)
+
+        if not config.DISABLE_TWITCH:
+            await twitch_api.stop()
+
+        stream_stats.stop()
+        save_states()
+        task_journal.close()
+
         if not config.DISABLE_OBS:
             await obs.disconnect()
@@ -2,7 +2,6 @@ import json
 import os
 import config
 import logging
-import yaml
 import html
 
 logger = logging.getLogger("uvicorn.error.misc")
@@ -29,6 +28,16 @@ def save_tokens(scope, access_token, refresh_token):
     logger.info(f"✅ Tokens saved for scope: {scope}")  # Debugging output
 
 
+def atomic_write_json(path: str, data, indent: int = 4):
+    """Write JSON atomically, so readers never see a half-written file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 def load_tokens(scope):
     """Load Twitch tokens from a file."""
     try:
@@ -43,17 +52,6 @@ def load_tokens(scope):
         return None
 
 
-def load_sequences():
-    """Load action sequences from YAML file."""
-    if not os.path.exists(config.SEQUENCES_FILE):
-        return {}  # Return empty if no YAML file exists
-
-    with open(config.SEQUENCES_FILE, "r", encoding="utf-8") as file:
-        data = yaml.safe_load(file)
-
-    return data.get("sequences", {})
-
-
 def replace_emotes(message: str, emotes: dict) -> str:
     """Replace emote text in a message with Twitch emote images inline."""
     if not emotes:
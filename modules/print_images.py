@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+from io import BytesIO
+
+import httpx
+from PIL import Image
+
+import config
+
+logger = logging.getLogger("uvicorn.error.printer")
+
+
+def dither(data: bytes, width: int) -> Image.Image:
+    """Scale an image down to the printer width and dither it to black and white."""
+    image = Image.open(BytesIO(data))
+    image.load()
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent avatars print on white paper
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA"))
+        image = background
+    if image.width > width:
+        image = image.resize((width, int(image.height * width / image.width)))
+    return image.convert("1")
+
+
+class BitmapCache:
+    """
+    Size-bounded on-disk LRU cache of dithered print images.
+
+    Bitmaps are stored as 1-bit PNGs keyed by image URL and printer width.
+    Reading a bitmap refreshes its modification time; when the cache grows
+    beyond `max_bytes`, the least recently used files are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str = config.PRINTER_IMAGE_CACHE_DIR,
+        max_bytes: int = config.PRINTER_IMAGE_CACHE_SIZE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, url: str, width: int) -> str:
+        key = hashlib.sha1(f"{width}:{url}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _entries(self):
+        """Return `(mtime, size, path)` of all cached files, oldest first."""
+        result = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".png"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Removed by another reader meanwhile
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(result)
+
+    def get(self, url: str, width: int):
+        path = self._path(url, width)
+        try:
+            image = Image.open(path)
+            image.load()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping unreadable cached image {path}: {e}")
+            self.misses += 1
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+
+        self.hits += 1
+        return image
+
+    def put(self, url: str, width: int, image: Image.Image):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+
+        path = self._path(url, width)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        image.save(tmp_path, format="PNG")
+
+        with self._lock:
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            self._size -= size
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            logger.debug(f"🗑️ Evicted cached print image {path}")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._size}
+
+
+bitmap_cache = BitmapCache()
+
+
+async def fetch_bitmap(client: httpx.AsyncClient, url: str, width: int):
+    """
+    Return the dithered image of `url`, from the cache or downloaded, or None.
+    Cache errors are only logged, they never fail the print job.
+    """
+    try:
+        image = await asyncio.to_thread(bitmap_cache.get, url, width)
+        if image is not None:
+            return image
+    except Exception as e:
+        logger.warning(f"⚠️ Print image cache read failed: {e}")
+
+    try:
+        logger.debug(f"Downloading image from {url}")
+        response = await client.get(url)
+        response.raise_for_status()
+        image = await asyncio.to_thread(dither, response.content, width)
+    except httpx.HTTPError as e:
+        logger.error(f"Error downloading image: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error processing image: {e}")
+        return None
+
+    try:
+        await asyncio.to_thread(bitmap_cache.put, url, width, image)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not cache print image: {e}")
+    return image
+
+
+async def fetch_bitmaps(urls, width: int = config.PRINTER_WIDTH) -> dict:
+    """Fetch every distinct image of a print job once, concurrently."""
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return {}
+
+    async with httpx.AsyncClient(
+        timeout=config.PRINTER_IMAGE_TIMEOUT, follow_redirects=True
+    ) as client:
+        images = await asyncio.gather(
+            *(fetch_bitmap(client, url, width) for url in urls)
+        )
+    return {url: image for url, image in zip(urls, images) if image is not None}
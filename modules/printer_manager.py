@@ -1,11 +1,9 @@
 import logging
 from escpos.printer import Usb, File, Network, CupsPrinter
 from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
-import requests
 from modules.schemas import PrintElement  # Import the schema
 import config
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger("uvicorn.error.printer")
 
@@ -90,33 +88,11 @@ class PrinterManager:
             logger.error(f"🖨️ Error checking printer status: {e}")
             return False
 
-    async def get_image(self, image_url: str):
-        if not image_url:
-            logger.warning("No image URL provided.")
-            return None
-        try:
-            logger.debug(f"Downloading image from {image_url}")
-            response = requests.get(image_url, timeout=10)  # Set a timeout
-            response.raise_for_status()
-            image = Image.open(BytesIO(response.content))
-            image = image.convert("1")  # Convert to black and white
-            # Scale image to fit printer width (example: 384px for common thermal printers)
-            printer_width = 384
-            if image.width > printer_width:
-                aspect_ratio = printer_width / image.width
-                image = image.resize((printer_width, int(image.height * aspect_ratio)))
-            logger.debug("Image processed successfully.")
-            return image
-        except requests.RequestException as e:
-            logger.error(f"Error downloading image: {e}")
-        except Exception as e:
-            logger.error(f"Error processing image: {e}")
-        return None
-
-    async def print_element(self, element: PrintElement):
+    def print_element(self, element: PrintElement, images: Dict[str, Image.Image]):
         """
         Print a single element (text or image).
         :param element: A `PrintElement` instance containing the data to print.
+        :param images: Dithered images of the job by URL (see modules/print_images.py).
         """
         if self.printer is None:
             raise RuntimeError("Printer is not initialized.")
@@ -133,7 +109,7 @@ class PrinterManager:
                 self.printer.text(f"{element.text}\n\n")
                 return True
             elif element.type == "image":
-                pimage = await self.get_image(element.url)
+                pimage = images.get(element.url)
                 if pimage:
                     self.printer.image(
                         pimage,
@@ -154,6 +130,44 @@ class PrinterManager:
             logger.error(f"Error printing element: {e}")
             raise
 
+    def print_job(
+        self,
+        elements: List[PrintElement],
+        as_image: bool = False,
+        images: Dict[str, Image.Image] = None,
+    ):
+        """
+        Print a complete job and cut the paper. Blocks until the printer is done,
+        so it is only called from the printer service thread. Images have to be
+        fetched before, see `modules.print_images.fetch_bitmaps`.
+        """
+        images = images or {}
+        if not self.is_online():
+            self.reconnect()
+            if not self.is_online():
+                raise RuntimeError("Printer not available")
+
+        if as_image:
+            pimage = self.create_image(elements=elements, images=images)
+            if pimage is None:
+                raise ValueError("Nothing to print")
+            self.printer.image(
+                pimage,
+                high_density_horizontal=True,
+                high_density_vertical=True,
+                impl="bitImageColumn",
+                fragment_height=960,
+                center=True,
+            )
+        else:
+            for element in elements:
+                if self.print_element(element, images):
+                    self.newline(1)
+        self.cut_paper(partial=True)
+
+        if self.connection_type == "cups":
+            self.printer.close()
+
     def cut_paper(self, partial: bool = False):
         """
         Cut the paper.
@@ -172,10 +186,13 @@ class PrinterManager:
             self.printer.set(align="left", normal_textsize=True)
             self.printer.ln(count)
 
-    async def create_image(self, elements: List[PrintElement]) -> Optional[Image.Image]:
+    def create_image(
+        self, elements: List[PrintElement], images: Dict[str, Image.Image]
+    ) -> Optional[Image.Image]:
         """
         Create a single image that contains all the print elements accumulated.
         :param elements: A list of PrintElement objects to be rendered.
+        :param images: Dithered images of the job by URL.
         :return: A PIL Image object with the combined content or None if no elements exist.
         """
         if not elements:
@@ -183,7 +200,7 @@ class PrinterManager:
             return None
 
         # Define printer width and spacing settings.
-        printer_width = 384
+        printer_width = config.PRINTER_WIDTH
         line_spacing = 10
 
         # Setup fonts. Attempt to load TrueType fonts, falling back to the default if unavailable.
@@ -221,7 +238,7 @@ class PrinterManager:
                     element_height += h + line_spacing
                 total_height += element_height
             elif element.type == "image":
-                pimage = await self.get_image(element.url)
+                pimage = images.get(element.url)
                 if pimage:
                     total_height += pimage.height + line_spacing
 
@@ -270,7 +287,7 @@ class PrinterManager:
                         draw.text((x, current_y), line, fill="black", font=font)
                         current_y += h + line_spacing
             elif element.type == "image":
-                pimage = await self.get_image(element.url)
+                pimage = images.get(element.url)
                 if pimage:
                     # Center the image horizontally.
                     x = (printer_width - pimage.width) // 2
@@ -0,0 +1,234 @@
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import config
+from modules.print_images import bitmap_cache, fetch_bitmaps
+from modules.printer_manager import PrinterManager
+from modules.schemas import PrintElement
+
+logger = logging.getLogger("uvicorn.error.printer")
+
+QUEUED = "queued"
+PRINTING = "printing"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass(slots=True)
+class PrintJob:
+    id: int
+    elements: List[PrintElement]
+    as_image: bool = False
+    source: Optional[str] = None
+    status: str = QUEUED
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    images: Dict[str, object] = field(default_factory=dict, repr=False)
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "source": self.source,
+            "error": self.error,
+            "elements": len(self.elements),
+            "as_image": self.as_image,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PrinterService:
+    """
+    Owns the printer on a dedicated thread.
+
+    python-escpos blocks until the device has taken the data, so all printer
+    access happens on the service thread: jobs are submitted to a queue and
+    printed one after another, and the event loop only waits for a job when
+    it needs the outcome. Jobs still queued when the thread stops or dies are
+    failed. Images are downloaded and dithered before a job is
+    queued, so the thread never waits on the network. The OBS printer cam is
+    shown for each job.
+    """
+
+    def __init__(self, manager: PrinterManager = None):
+        self.manager = manager or PrinterManager()
+        self.obs = None
+        self.current = None
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._loop = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, obs=None):
+        """Start the printer thread. `obs` is used to show the printer cam."""
+        if self.is_running:
+            return
+        self.obs = obs
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run, name="printer", daemon=True)
+        self._thread.start()
+        logger.info("🚀 Printer service started.")
+
+    def stop(self, timeout: float = config.PRINTER_STOP_TIMEOUT):
+        """Finish the current job, then close the printer."""
+        if not self.is_running:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("⚠️ Printer thread did not stop in time")
+            self._fail_pending("Printer service stopped")
+        self._thread = None
+        logger.info("🛑 Printer service stopped.")
+
+    async def submit(
+        self, elements: List[PrintElement], as_image: bool = False, source: str = None
+    ) -> PrintJob:
+        """Fetch the images of a print job, queue it and return it."""
+        if not self.is_running:
+            raise RuntimeError("Printer service is not running")
+
+        elements = list(elements)
+        job = PrintJob(next(self._ids), elements, as_image, source)
+        job.images = await fetch_bitmaps(
+            element.url for element in elements if element.type == "image"
+        )
+        job.future = self._loop.create_future()
+        self._jobs[job.id] = job
+        self._trim_history()
+
+        self._queue.put(job)
+        logger.info(f"🖨️ Print job #{job.id} queued ({source or 'api'})")
+        return job
+
+    async def wait(self, job: PrintJob, timeout: float = None) -> PrintJob:
+        """Wait until a job is printed or failed."""
+        await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[PrintJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def _trim_history(self):
+        surplus = len(self._jobs) - config.PRINTER_JOB_HISTORY
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in (DONE, FAILED)
+        ]
+        for job_id in finished[: max(0, surplus)]:
+            del self._jobs[job_id]
+
+    def _run(self):
+        try:
+            self.manager.initialize()
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                self._print(job)
+        except Exception as e:
+            logger.error(f"❌ Printer thread crashed: {e}")
+        finally:
+            self._fail_pending("Printer service stopped")
+            self.manager.shutdown()
+
+    def _fail_pending(self, reason: str):
+        """Fail the jobs left in the queue, so nobody waits for them forever."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                continue
+            job.status = FAILED
+            job.error = reason
+            job.finished_at = time.time()
+            logger.warning(f"⚠️ Print job #{job.id} dropped: {reason}")
+            try:
+                self._loop.call_soon_threadsafe(self._resolve, job)
+            except RuntimeError:
+                pass  # The event loop is already closed
+
+    def _print(self, job: PrintJob):
+        self.current = job
+        job.status = PRINTING
+        job.started_at = time.time()
+        cam_items = self._call_async(self._show_cam(), [])
+
+        try:
+            self.manager.print_job(job.elements, job.as_image, job.images)
+            job.status = DONE
+            logger.info(f"🖨️ Print job #{job.id} done")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"❌ Print job #{job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            job.images = {}
+            self.current = None
+            self._loop.call_soon_threadsafe(self._resolve, job)
+
+        if cam_items:
+            time.sleep(config.PRINTER_CAM_DELAY)
+            self._call_async(self._hide_cam(cam_items))
+
+    @staticmethod
+    def _resolve(job: PrintJob):
+        if not job.future.done():
+            job.future.set_result(job.status)
+
+    def _call_async(self, coroutine, default=None):
+        """Run a coroutine in the app's event loop and wait for its result."""
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(
+                timeout=10
+            )
+        except Exception as e:
+            logger.error(f"❌ Printer cam error: {e}")
+            return default
+
+    async def _show_cam(self):
+        if not self.obs:
+            return []
+        cam_items = await self.obs.find_scene_item(config.OBS_PRINTER_CAM)
+        for item in cam_items:
+            await self.obs.set_source_visibility(item["scene"], item["id"], True)
+        return cam_items
+
+    async def _hide_cam(self, cam_items):
+        for item in cam_items:
+            await self.obs.set_source_visibility(item["scene"], item["id"], False)
+
+    def stats(self):
+        return {
+            "running": self.is_running,
+            "queued": self._queue.qsize(),
+            "current": self.current.id if self.current else None,
+            "image_cache": bitmap_cache.stats(),
+        }
+
+
+printer_service = PrinterService()
@@ -0,0 +1,122 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+import config
+from modules.websocket_handler import broadcast_message
+
+logger = logging.getLogger("uvicorn.error.alert_scheduler")
+
+# Alert types merged while they wait, per user (a burst of gift events)
+MERGED_TYPES = {"gift_sub": "size"}
+
+
+class AlertScheduler:
+    """
+    Sends overlay alerts one at a time.
+
+    Alerts wait in a priority queue (lower `ALERT_PRIORITIES` value first,
+    then in arrival order) and each one occupies the overlay for its known
+    duration from `ALERT_DURATIONS`. Waiting gift sub alerts of the same gifter
+    are merged into one. When nothing is queued the scheduler sleeps until the
+    next `put()`, so an idle overlay costs nothing.
+    """
+
+    def __init__(
+        self,
+        durations: dict = None,
+        priorities: dict = None,
+        gap: float = config.ALERT_GAP,
+    ):
+        self.durations = durations or config.ALERT_DURATIONS
+        self.priorities = priorities or config.ALERT_PRIORITIES
+        self.gap = gap
+        self.current = None
+        self.sent = 0
+        self.merged = 0
+        self._heap = []
+        self._mergeable = {}
+        self._order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._loop = None
+        self._task = None
+
+    def put(self, alert: dict):
+        """Queue an alert. Safe to call from EventSub, which runs in its own loop."""
+        try:
+            same_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            same_loop = False
+
+        if self._loop and not same_loop:
+            self._loop.call_soon_threadsafe(self._put, alert)
+        else:
+            self._put(alert)
+
+    def _put(self, alert: dict):
+        alert_type = alert.get("type")
+
+        merge_field = MERGED_TYPES.get(alert_type)
+        if merge_field:
+            key = (alert_type, alert.get("user"))
+            waiting = self._mergeable.get(key)
+            if waiting:
+                waiting[merge_field] = waiting.get(merge_field, 0) + alert.get(
+                    merge_field, 0
+                )
+                self.merged += 1
+                logger.info(f"➕ Merged {alert_type} alert of {alert.get('user')}")
+                return
+            self._mergeable[key] = alert
+
+        priority = self.priorities.get(alert_type, self.priorities.get("default", 5))
+        heapq.heappush(self._heap, (priority, next(self._order), alert))
+        self._wakeup.set()
+
+    def qsize(self):
+        return len(self._heap)
+
+    def duration(self, alert: dict) -> float:
+        return self.durations.get(alert.get("type"), self.durations.get("default", 7))
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        logger.info("🚀 Alert scheduler started")
+
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, alert = heapq.heappop(self._heap)
+            self._mergeable.pop((alert.get("type"), alert.get("user")), None)
+
+            self.current = alert
+            try:
+                await broadcast_message({"alert": alert})
+                self.sent += 1
+                logger.info(f"📣 Alert: {alert.get('type')} ({alert.get('user')})")
+            except Exception as e:
+                logger.error(f"❌ Failed to send alert: {e}")
+
+            await asyncio.sleep(self.duration(alert) + self.gap)
+            self.current = None
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        return {
+            "queued": self.qsize(),
+            "current": self.current,
+            "sent": self.sent,
+            "merged": self.merged,
+        }
@@ -0,0 +1,183 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+import config
+
+logger = logging.getLogger("uvicorn.error.chat_queue")
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+def split_message(message: str, max_length: int = config.CHAT_MAX_MESSAGE_LENGTH):
+    """Split a message into chunks of at most `max_length` characters on word boundaries."""
+    message = message.strip()
+    if len(message) <= max_length:
+        return [message] if message else []
+
+    chunks = []
+    current = ""
+
+    for word in message.split():
+        # Hard-cut words that are longer than a whole message
+        while len(word) > max_length:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(word[:max_length])
+            word = word[max_length:]
+
+        if not word:
+            continue
+
+        if current and len(current) + 1 + len(word) > max_length:
+            chunks.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+class TokenBucket:
+    """
+    Token bucket that never lets more than `limit` tokens through in any `window`.
+
+    The bucket holds at most `burst` tokens and refills at `(limit - burst) / window`
+    tokens per second, so a full burst followed by a steady refill still stays within
+    Twitch's sliding-window limit.
+    """
+
+    def __init__(self, limit: int, window: float, burst: int):
+        self.capacity = max(1, min(burst, limit - 1))
+        self.rate = max(limit - self.capacity, 1) / window
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def release(self):
+        """Return an unused token to the bucket."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class ChatMessageQueue:
+    """
+    Outbound chat queue that respects Twitch's send limits.
+
+    Messages are split into chat-sized chunks, identical pending chunks are merged
+    and chunks are sent in priority order (lowest value first, FIFO within a priority).
+    """
+
+    def __init__(
+        self,
+        send_func,
+        limit: int = config.CHAT_RATE_LIMIT,
+        window: float = config.CHAT_RATE_WINDOW,
+        burst: int = config.CHAT_RATE_BURST,
+        max_length: int = config.CHAT_MAX_MESSAGE_LENGTH,
+    ):
+        self.send_func = send_func
+        self.bucket = TokenBucket(limit, window, burst)
+        self.max_length = max_length
+        self._heap = []
+        self._pending = {}  # text -> heap entry
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._loop = None
+        self._worker = None
+        self.sent_count = 0
+        self.failed_count = 0
+        self.merged_count = 0
+
+    async def put(self, message: str, priority: int = PRIORITY_NORMAL):
+        """Queue a message for sending. Safe to call from other event loops."""
+        if self._loop and asyncio.get_running_loop() is not self._loop:
+            self._loop.call_soon_threadsafe(self._enqueue, message, priority)
+        else:
+            self._enqueue(message, priority)
+
+    def _enqueue(self, message: str, priority: int):
+        for chunk in split_message(message, self.max_length):
+            existing = self._pending.get(chunk)
+            if existing:
+                self.merged_count += 1
+                if priority >= existing[0]:
+                    logger.debug(f"🔁 Merged duplicate chat message: {chunk}")
+                    continue
+                # Re-queue the duplicate with the higher priority
+                existing[3] = False
+
+            entry = [priority, next(self._counter), chunk, True]
+            self._pending[chunk] = entry
+            heapq.heappush(self._heap, entry)
+
+        self._wakeup.set()
+
+    def _pop(self):
+        while self._heap:
+            priority, _, text, valid = heapq.heappop(self._heap)
+            if valid:
+                del self._pending[text]
+                return text
+        return None
+
+    def qsize(self):
+        """Number of chunks waiting to be sent."""
+        return len(self._pending)
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Take the token first so higher-priority messages queued while waiting win
+            await self.bucket.acquire()
+
+            text = self._pop()
+            if text is None:
+                self.bucket.release()
+                continue
+
+            try:
+                await self.send_func(text)
+                self.sent_count += 1
+            except Exception as e:
+                self.failed_count += 1
+                logger.error(f"❌ Failed to send queued chat message: {e}")
+
+    def start(self):
+        """Start the sender task on the current event loop."""
+        if not self._worker:
+            self._loop = asyncio.get_running_loop()
+            self._worker = asyncio.create_task(self._run())
+            logger.info("🚀 Chat message queue started.")
+
+    def stop(self):
+        """Stop the sender task. Pending messages are dropped."""
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+            self._loop = None
+            logger.info(f"🛑 Chat message queue stopped ({self.qsize()} pending).")
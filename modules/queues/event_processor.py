@@ -1,238 +1,273 @@
 import asyncio
-import inspect
 import logging
-import json
+import time
 from twitchAPI.type import CustomRewardRedemptionStatus
 
 from database.crud.events import save_event
 from modules.schemas import PrintElement
 from modules.websocket_handler import broadcast_message
-from modules.sequence_runner import execute_sequence
-from modules.queues.function_registry import get_function
+from modules.sequence_runner import start_sequence
+from modules.printer_service import DONE
+from modules.queues.function_registry import get_function, get_function_lane
+from modules.queues.lanes import ResourceLane
+from modules.queues.tasks import (
+    CreateRedemptionTask,
+    FunctionTask,
+    HeatClickTask,
+    PrintCommandTask,
+)
 import config
 
 logger = logging.getLogger("uvicorn.error.event_queue_processor")
 
 worker_count = 0  # Track how many times this function is started
 
+# Resource lanes of the event queue (see process_event_queue)
+LANES = {}
+
+
+# Lanes of task types that do not depend on the task content
+TASK_LANES = {PrintCommandTask: "printer"}
+
+
+def get_task_lane(task):
+    """Return the name of the resource lane a task runs in."""
+    if type(task) is FunctionTask:
+        return get_function_lane(task.name)
+    return TASK_LANES.get(type(task), "default")
+
 
 async def process_event_queue(app):
-    """Continuously processes events from the queue"""
+    """
+    Processes events from the queue in one lane per resource.
+
+    Printer and OBS work run serially in their own lanes, everything else runs
+    in the parallel default lane, so a print job no longer blocks heat clicks,
+    overlay functions or reward creation. Within a lane the event queue hands
+    out tasks by priority class.
+    """
 
     global worker_count
     worker_count += 1
     logger.info(f"🚀 Starting Event Queue Processor #{worker_count}")
 
+    event_queue = app.state.event_queue
+
+    def resolve_lane(task):
+        lane = get_task_lane(task)
+        return lane if lane in LANES else "default"
+
+    async def handle(task):
+        logger.info(f"📥 Processing event: {task}")
+        return await process_task(app, task)
+
+    for name, concurrency in config.EVENT_QUEUE_LANES.items():
+        LANES[name] = ResourceLane(name, concurrency)
+    event_queue.set_lane_resolver(resolve_lane)
+
+    try:
+        for lane in LANES.values():
+            lane.start(event_queue, handle)
+        await asyncio.gather(*(w for lane in LANES.values() for w in lane.workers))
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"❌ Error in Event Queue Processor: {e}")
+    finally:
+        workers = [worker for lane in LANES.values() for worker in lane.workers]
+        for lane in LANES.values():
+            lane.stop()
+        # Let cancelled tasks settle before the journal is closed
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def get_lane_stats():
+    """Return queue depth and activity of all lanes."""
+    return {name: lane.stats() for name, lane in LANES.items()}
+
+
+async def process_task(app, task):
+    """
+    Process a single task from the event queue and resolve its result future.
+    Returns False if the handler failed.
+    """
+    if task.cancelled():
+        logger.info(f"🚫 Skipping cancelled task: {task}")
+        return True
+
+    handler = TASK_HANDLERS.get(type(task))
+
+    if handler is None:
+        logger.warning(f"⚠️ No handler for task type {type(task).__name__}: {task}")
+        task.set_exception(TypeError(f"Unknown task type {type(task).__name__}"))
+        return True
+
+    task.started_at = time.monotonic()
+    running = asyncio.ensure_future(handler(app, task))
+
+    if task.future:
+        # Cancelling the result future also cancels the running handler
+        task.future.add_done_callback(
+            lambda future: future.cancelled()
+            and running.get_loop().call_soon_threadsafe(running.cancel)
+        )
+
+    try:
+        task.set_result(await running)
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise  # The worker itself is shutting down
+        logger.info(f"🚫 Task cancelled while running: {task}")
+    except Exception as e:
+        logger.error(f"❌ Task {type(task).__name__} failed: {e}")
+        task.set_exception(e)
+        return False
+    return True
+
+
+async def process_function(app, task: FunctionTask):
+    func = get_function(task.name)
+
+    if not func:
+        save_event("error", None, f"Function not found: {task.name}")
+        raise LookupError(f"Function '{task.name}' not found")
+
+    try:
+        result = await func(task.data)
+    except Exception as e:
+        save_event("error", None, f"Failed function: {task.name}, Error: {e}")
+        raise
+
+    logger.info(f"✅ Executed function: {task.name} with parameters: {task.data}")
+    return result
+
+
+async def process_print_command(app, task: PrintCommandTask):
+    twitch_api = app.state.twitch_api
+    printer = app.state.printer
+
+    user = task.user
+    user_id = task.user_id
+    status = CustomRewardRedemptionStatus.CANCELED
+
+    if task.command != "print":
+        return
+
+    # Without Twitch the redemption can neither be fulfilled nor refunded,
+    # fail before printing so the task is retried
+    if twitch_api is None or not twitch_api.is_running:
+        raise RuntimeError("Twitch API is not ready")
+
+    try:
+        if printer is None:
+            raise RuntimeError("Printer is disabled")
+
+        user_data = await twitch_api.users.get_user_info(user_id=user_id)
+        message = task.message
+        logger.info(f"🖨️ Printing requested by {user}: {message}")
+
+        print_elements = [
+            PrintElement(type="headline_1", text="Chatogram"),
+            PrintElement(
+                type="image",
+                url=user_data.get("profile_image_url", ""),
+            ),
+            PrintElement(type="headline_2", text=user),
+            PrintElement(type="message", text=message),
+        ]
+
+        # The printer thread prints the job, we only wait for the outcome
+        job = await printer.submit(
+            print_elements, as_image=True, source=f"chatogram:{user}"
+        )
+        try:
+            await printer.wait(job, config.PRINTER_JOB_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Print job #{job.id} timed out ({job.status})")
+        logger.info(f"🖨️ Print status: {job.status}")
+
+        if job.status == DONE:
+            status = CustomRewardRedemptionStatus.FULFILLED
+
+    except Exception as e:
+        logger.error(f"❌ Error in printing from Twitch command: {e}")
+
+    # Not in a `finally`: when shutdown cancels the task, the redemption is
+    # neither refunded nor acknowledged, and the journal replays it
+    await twitch_api.twitch.update_redemption_status(
+        config.TWITCH_CHANNEL_ID,
+        task.reward_id,
+        task.redeem_id,
+        status,
+    )
+
+
+async def process_heat_click(app, task: HeatClickTask):
     twitch_api = app.state.twitch_api
     twitch_chat = app.state.twitch_chat
-    obs = app.state.obs
     event_queue = app.state.event_queue
-    printer = app.state.printer
 
     try:
-        while True:
-            task = await event_queue.get()
-            logger.info(f"📥 Processing event from queue: {task}")
-
-            # Handle function execution
-            if "function" in task:
-                function_name = task["function"]
-                parameters = task.get("data", {})
-
-                if parameters == "None":
-                    parameters = {}
-
-                func = get_function(function_name)
-
-                if callable(func):
-                    try:
-                        sig = inspect.signature(func)
-                        param_types = [
-                            param.annotation for param in sig.parameters.values()
-                        ]
-
-                        if param_types and param_types[0] not in [
-                            inspect.Parameter.empty,
-                            dict,
-                        ]:
-                            expected_type = param_types[0]
-                            if isinstance(parameters, dict):
-                                parameters = expected_type(**parameters)
-
-                        if inspect.iscoroutinefunction(func):
-                            (
-                                await func(parameters)
-                                if len(param_types) == 1
-                                else await func(**parameters)
-                            )
-                        else:
-                            (
-                                func(parameters)
-                                if len(param_types) == 1
-                                else func(**parameters)
-                            )
-
-                        logger.info(
-                            f"✅ Executed function: {function_name} with parameters: {parameters}"
-                        )
-
-                    except TypeError as e:
-                        logger.error(f"❌ Function execution failed: {e}")
-                        save_event(
-                            "error",
-                            None,
-                            f"Failed function: {function_name}, Error: {e}",
-                        )
-                else:
-                    logger.warning(
-                        f"⚠️ Function '{function_name}' not found or not callable!"
-                    )
-                    save_event("error", None, f"Function not found: {function_name}")
-
-            # Process Twitch message printing
-            if "command" in task:
-                command = task["command"]
-                user = task["user"]
-                user_id = task["user_id"]
-
-                try:
-                    user_data = await twitch_api.users.get_user_info(user_id=user_id)
-
-                    if command == "print":
-                        message = task.get("message", "")
-                        logger.info(f"🖨️ Printing requested by {user}: {message}")
-
-                        print_elements = [
-                            PrintElement(type="headline_1", text="Chatogram"),
-                            PrintElement(
-                                type="image",
-                                url=user_data.get("profile_image_url", ""),
-                            ),
-                            PrintElement(type="headline_2", text=user),
-                            PrintElement(type="message", text=message),
-                        ]
-
-                        # Fetch cam errors
-                        try:
-                            cam_result = await obs.find_scene_item(
-                                config.OBS_PRINTER_CAM
-                            )
-                            for item in cam_result:
-                                await obs.set_source_visibility(
-                                    item["scene"], item["id"], True
-                                )
-                        except Exception as e:
-                            logger.error(f"❌ Error switching CAM on {e}")
-
-                        # Print Message
-                        if not printer.is_online():
-                            printer.reconnect()
-                            if not printer.is_online():
-                                logger.error("❌ Printer not available")
-
-                        # Print a image
-                        pimage = await printer.create_image(elements=print_elements)
-                        printer.printer.image(
-                            pimage,
-                            high_density_horizontal=True,
-                            high_density_vertical=True,
-                            impl="bitImageColumn",
-                            fragment_height=960,
-                            center=True,
-                        )
-                        printer.cut_paper(partial=True)
-
-                        if printer.connection_type == "cups":
-                            printer.printer.close()
-
-                        logger.info(f"🖨️ Print status: done!")
-
-                        await twitch_api.twitch.update_redemption_status(
-                            config.TWITCH_CHANNEL_ID,
-                            task["reward_id"],
-                            task["redeem_id"],
-                            CustomRewardRedemptionStatus.FULFILLED,
-                        )
-
-                except Exception as e:
-                    logger.error(f"❌ Error in printing from Twitch command: {e}")
-                    await twitch_api.twitch.update_redemption_status(
-                        config.TWITCH_CHANNEL_ID,
-                        task["reward_id"],
-                        task["redeem_id"],
-                        CustomRewardRedemptionStatus.CANCELED,
-                    )
-                finally:
-                    await asyncio.sleep(
-                        6
-                    )  # * Sleep is currently set to fit the cups delay
-                    try:
-                        for item in cam_result:
-                            await obs.set_source_visibility(
-                                item["scene"], item["id"], False
-                            )
-                    except Exception as e:
-                        logger.error("Could not deactivate Printer cam")
-
-            # Process heatmap clicks
-            if "heat_click" in task:
-                try:
-                    click_event = task["heat_click"]
-
-                    user = click_event.get("user_id")
-                    x = click_event.get("x")
-                    y = click_event.get("y")
-                    clicked_object = click_event.get("object_id")
-
-                    real_user = "Anonymous" if user.startswith("A") else "Unverified"
-
-                    if not user.startswith("A") and not user.startswith("U"):
-                        user_data = await twitch_api.get_user_info(user_id=user)
-                        real_user = user_data.get("display_name", "Unknown")
-
-                    logger.info(
-                        f"🖱️ Click detected! User: {real_user}, X: {x}, Y: {y}, Object: {clicked_object}"
-                    )
-
-                    if clicked_object == "hidden_star":
-                        await broadcast_message(
-                            {
-                                "hidden": {
-                                    "action": "found",
-                                    "user": real_user,
-                                    "x": x,
-                                    "y": y,
-                                }
-                            }
-                        )
-                        await execute_sequence("reset_star", event_queue)
-                        await twitch_chat.send_message(
-                            f"{real_user} hat sich erbarmt und sauber gemacht!"
-                        )
-                        save_event("heat_click", user, "Hat aufgeräumt!")
-
-                except Exception as e:
-                    logger.error(f"❌ Error processing heatmap click: {e}")
-
-            # Create Twitch Channel Point Redemptions
-            if "create_redemption" in task:
-                try:
-                    redemption = task["create_redemption"]
-
-                    await twitch_api.twitch.create_custom_reward(
-                        broadcaster_id=config.TWITCH_CHANNEL_ID,
-                        title=redemption.get("title"),
-                        cost=redemption.get("cost"),
-                        is_enabled=True,
-                    )
-
-                    logger.info(
-                        f"✅ Created Twitch reward: {redemption.get('title')} for {redemption.get('cost')} points"
-                    )
-
-                except Exception as e:
-                    logger.error(f"❌ Failed to create Twitch reward: {e}")
-
-            event_queue.task_done()
+        user = task.user_id
+        x = task.x
+        y = task.y
+        clicked_object = task.object_id
+
+        real_user = "Anonymous" if user.startswith("A") else "Unverified"
+
+        if not user.startswith("A") and not user.startswith("U"):
+            user_data = None
+            if twitch_api and twitch_api.users:
+                user_data = await twitch_api.users.cache.get(user)
+            real_user = user_data["display_name"] if user_data else "Unknown"
+
+        logger.info(
+            f"🖱️ Click detected! User: {real_user}, X: {x}, Y: {y}, Object: {clicked_object}"
+        )
+
+        if clicked_object == "hidden_star":
+            await broadcast_message(
+                {
+                    "hidden": {
+                        "action": "found",
+                        "user": real_user,
+                        "x": x,
+                        "y": y,
+                    }
+                }
+            )
+            # Not awaited: its steps are queued behind us in this lane
+            start_sequence("reset_star", event_queue)
+            await twitch_chat.send_message(
+                f"{real_user} hat sich erbarmt und sauber gemacht!"
+            )
+            save_event("heat_click", user, "Hat aufgeräumt!")
+
     except Exception as e:
-        logger.error(f"❌ Error in Event Queue Processor: {e}")
+        logger.error(f"❌ Error processing heatmap click: {e}")
+
+
+async def process_create_redemption(app, task: CreateRedemptionTask):
+    twitch_api = app.state.twitch_api
+
+    try:
+        await twitch_api.twitch.create_custom_reward(
+            broadcaster_id=config.TWITCH_CHANNEL_ID,
+            title=task.title,
+            cost=task.cost,
+            is_enabled=True,
+        )
+
+        logger.info(f"✅ Created Twitch reward: {task.title} for {task.cost} points")
+
+    except Exception as e:
+        logger.error(f"❌ Failed to create Twitch reward: {e}")
+        raise  # Retried by the event queue
+
+
+TASK_HANDLERS = {
+    FunctionTask: process_function,
+    PrintCommandTask: process_print_command,
+    HeatClickTask: process_heat_click,
+    CreateRedemptionTask: process_create_redemption,
+}
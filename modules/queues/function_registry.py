@@ -1,3 +1,4 @@
+import inspect
 import logging
 
 logger = logging.getLogger("uvicorn.error.function_registry")
@@ -5,12 +6,69 @@ logger = logging.getLogger("uvicorn.error.function_registry")
 FUNCTION_REGISTRY = {}
 
 
-def register_function(name, func):
-    """Registers a function globally for all event queues."""
-    FUNCTION_REGISTRY[name] = func
+class FunctionAdapter:
+    """
+    Calls a registered function with a task payload.
+
+    The signature is inspected once at registration: a function with a single
+    positional parameter gets the payload as one argument (converted into the
+    annotated model if there is one), otherwise the payload is passed as
+    keyword arguments. Keyword-only options (e.g. a chat priority) are not part
+    of the payload.
+    """
+
+    __slots__ = ("name", "func", "lane", "is_coroutine", "single_argument", "model")
+
+    def __init__(self, name, func, lane="default"):
+        self.name = name
+        self.func = func
+        self.lane = lane
+        self.is_coroutine = inspect.iscoroutinefunction(func)
+
+        param_types = [
+            param.annotation
+            for param in inspect.signature(func).parameters.values()
+            if param.kind != inspect.Parameter.KEYWORD_ONLY
+        ]
+        self.single_argument = len(param_types) == 1
+        self.model = (
+            param_types[0]
+            if param_types and param_types[0] not in (inspect.Parameter.empty, dict)
+            else None
+        )
+
+    async def __call__(self, parameters):
+        if parameters in (None, "None"):
+            parameters = {}
+
+        if self.model and isinstance(parameters, dict):
+            parameters = self.model(**parameters)
+
+        if self.single_argument:
+            result = self.func(parameters)
+        else:
+            result = self.func(**parameters)
+
+        if self.is_coroutine:
+            result = await result
+        return result
+
+
+def register_function(name, func, lane="default"):
+    """Registers a function globally for all event queues.
+
+    `lane` names the resource lane of the event queue the function runs in.
+    """
+    FUNCTION_REGISTRY[name] = FunctionAdapter(name, func, lane)
     logger.info(f"🔹 Registered function: {name}")
 
 
 def get_function(name):
-    """Retrieves a function from the registry."""
+    """Retrieves the call adapter of a registered function."""
     return FUNCTION_REGISTRY.get(name, None)
+
+
+def get_function_lane(name):
+    """Retrieves the lane a registered function runs in."""
+    adapter = FUNCTION_REGISTRY.get(name)
+    return adapter.lane if adapter else "default"
@@ -0,0 +1,126 @@
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import fields
+
+import config
+from modules.queues.tasks import DURABLE_TASKS, QueuedTask
+
+logger = logging.getLogger("uvicorn.error.queue_manager")
+
+# Fields of the base task that are runtime state, not payload
+RUNTIME_FIELDS = {f.name for f in fields(QueuedTask)}
+
+
+class TaskJournal:
+    """
+    On-disk journal of durable event queue tasks (SQLite).
+
+    A task is written when it is queued and marked as acknowledged when its
+    handler succeeded, both synchronously committed. Tasks that were never
+    acknowledged (e.g. because the app was restarted while a print job was
+    waiting, or the handler failed) are queued again on startup. Failed runs
+    are counted in `attempts`. Acknowledged rows are removed by `compact()`.
+    """
+
+    def __init__(self, path: str = config.EVENT_QUEUE_JOURNAL_FILE):
+        self.path = path
+        self.db = None
+        self._acked_since_compact = 0
+
+    def open(self):
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                task_class TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                acked_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(tasks)")]
+        if "attempts" not in columns:
+            self.db.execute(
+                "ALTER TABLE tasks ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+        logger.info(f"📒 Event queue journal opened: {self.path}")
+
+    def close(self):
+        if self.db:
+            self.compact()
+            self.db.close()
+            self.db = None
+
+    def append(self, task: QueuedTask, task_class: str):
+        """Record a queued task and return its journal id."""
+        payload = {
+            f.name: getattr(task, f.name)
+            for f in fields(task)
+            if f.name not in RUNTIME_FIELDS
+        }
+        cursor = self.db.execute(
+            "INSERT INTO tasks (type, task_class, payload, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (type(task).__name__, task_class, json.dumps(payload), time.time()),
+        )
+        return cursor.lastrowid
+
+    def ack(self, journal_id: int):
+        """Mark a task as processed."""
+        self.db.execute(
+            "UPDATE tasks SET acked_at = ? WHERE id = ?", (time.time(), journal_id)
+        )
+        self._acked_since_compact += 1
+        if self._acked_since_compact >= config.EVENT_QUEUE_JOURNAL_COMPACT_EVERY:
+            self.compact()
+
+    def fail(self, journal_id: int, attempts: int):
+        """Record the number of failed runs of a task, it stays unacknowledged."""
+        self.db.execute(
+            "UPDATE tasks SET attempts = ? WHERE id = ?", (attempts, journal_id)
+        )
+
+    def pending(self):
+        """Return `(task, task_class)` for all unacknowledged tasks, oldest first."""
+        result = []
+        rows = self.db.execute(
+            "SELECT id, type, task_class, payload, attempts FROM tasks "
+            "WHERE acked_at IS NULL ORDER BY id"
+        ).fetchall()
+        for journal_id, type_name, task_class, payload, attempts in rows:
+            task_type = DURABLE_TASKS.get(type_name)
+            if task_type is None:
+                logger.warning(f"⚠️ Dropping journal entry {journal_id}: {type_name}")
+                self.ack(journal_id)
+                continue
+
+            task = task_type(**json.loads(payload))
+            task.journal_id = journal_id
+            task.attempts = attempts
+            result.append((task, task_class))
+        return result
+
+    def compact(self):
+        """Delete acknowledged tasks and shrink the write-ahead log."""
+        self.db.execute("DELETE FROM tasks WHERE acked_at IS NOT NULL")
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._acked_since_compact = 0
+
+
+def replay_journal(journal: TaskJournal, event_queue):
+    """Queue all unacknowledged tasks of the journal again."""
+    pending = journal.pending()
+    for task, task_class in pending:
+        event_queue.put_nowait(task, task_class)
+
+    if pending:
+        logger.info(f"♻️ Replayed {len(pending)} unfinished tasks from the journal")
+    return len(pending)
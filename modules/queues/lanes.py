@@ -0,0 +1,62 @@
+import asyncio
+import logging
+
+logger = logging.getLogger("uvicorn.error.queue_manager")
+
+
+class ResourceLane:
+    """
+    A pool of workers for event queue tasks that share one resource.
+
+    A lane with `concurrency=1` runs its tasks strictly one after another (e.g.
+    the printer), larger lanes run up to `concurrency` tasks at the same time.
+    Workers only pull tasks of their own lane from the event queue, so a task
+    only waits behind tasks that need the same resource. `handler(task)`
+    returns False when the task failed, so it is not acknowledged.
+    """
+
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.workers = []
+        self.source = None
+        self.active = 0
+        self.processed = 0
+
+    def start(self, source, handler):
+        """Start workers that take tasks from `source` and run `handler(task)`."""
+        self.source = source
+        for index in range(self.concurrency - len(self.workers)):
+            self.workers.append(asyncio.create_task(self._worker(index + 1, handler)))
+        logger.info(f"🚀 Lane '{self.name}' started with {self.concurrency} worker(s)")
+
+    async def _worker(self, number: int, handler):
+        while True:
+            task = await self.source.get(self.name)
+            self.active += 1
+            try:
+                succeeded = await handler(task) is not False
+            except asyncio.CancelledError:
+                # Shutting down: an unfinished durable task stays in the journal
+                self.active -= 1
+                raise
+            except Exception as e:
+                logger.error(f"❌ Lane '{self.name}' worker #{number} failed: {e}")
+                succeeded = False
+
+            self.active -= 1
+            self.processed += 1
+            self.source.task_done(task, succeeded)
+
+    def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "queued": self.source.qsize(self.name) if self.source else 0,
+            "active": self.active,
+            "processed": self.processed,
+        }
@@ -1,5 +1,6 @@
-import asyncio
+from modules.queues.priority_queue import PriorityEventQueue
+from modules.queues.alert_scheduler import AlertScheduler
 
-event_queue = asyncio.Queue()
+event_queue = PriorityEventQueue()
 
-alert_queue = asyncio.Queue()
+alert_queue = AlertScheduler()
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import config
+
+logger = logging.getLogger("uvicorn.error.queue_manager")
+
+# Task classes, highest priority first
+INTERACTIVE = "interactive"  # Direct viewer reactions (heat clicks)
+ALERT = "alert"  # Redemptions and other viewer-visible fulfilment
+BACKGROUND = "background"  # Sequences, scheduled jobs, admin actions
+TASK_CLASSES = (INTERACTIVE, ALERT, BACKGROUND)
+
+DEFAULT_LANE = "default"
+
+
+class ClassMetrics:
+    __slots__ = ("enqueued", "dequeued", "total_wait", "max_wait", "starved")
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dequeued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.starved = 0
+
+
+class LaneQueues:
+    """The per-class queues of one resource lane."""
+
+    def __init__(self):
+        self.queues = {task_class: deque() for task_class in TASK_CLASSES}
+        self.not_empty = asyncio.Event()
+        self.promoted_last = False
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+
+class PriorityEventQueue:
+    """
+    Event queue with named priority classes, partitioned by resource lane.
+
+    `get(lane)` returns the oldest task of the highest non-empty class of that
+    lane, unless a lower class has waited longer than its `max_wait`; then that
+    task is served first so background work cannot starve. Promotions alternate
+    with regular picks, so an aged backlog never locks out higher classes.
+
+    Tasks are sorted into lanes on `put()` by the lane resolver installed by
+    the event processor, so a task only ever waits behind tasks that need the
+    same resource. Durable tasks are recorded in the attached journal until
+    `task_done()` acknowledges them; failed ones are queued again after
+    `EVENT_QUEUE_RETRY_DELAY`.
+    """
+
+    def __init__(self, max_wait: dict = None):
+        self.max_wait = max_wait or config.EVENT_QUEUE_MAX_WAIT
+        self._lanes = {DEFAULT_LANE: LaneQueues()}
+        self._metrics = {task_class: ClassMetrics() for task_class in TASK_CLASSES}
+        self._resolve_lane = None
+        self._loop = None
+        self._unfinished = 0
+        self.journal = None
+
+    def attach_journal(self, journal):
+        """Record durable tasks in `journal` (see modules/queues/journal.py)."""
+        self.journal = journal
+
+    def set_lane_resolver(self, resolver):
+        """Install `resolver(task) -> lane name` and re-sort already queued tasks."""
+        self._resolve_lane = resolver
+
+        queued = []
+        for lane in self._lanes.values():
+            for task_class, queue in lane.queues.items():
+                queued.extend((entry, task_class) for entry in queue)
+                queue.clear()
+
+        for (enqueued_at, task), task_class in sorted(queued, key=lambda e: e[0][0]):
+            lane = self._lane(self._resolve_lane(task))
+            lane.queues[task_class].append((enqueued_at, task))
+            lane.not_empty.set()
+
+    def _lane(self, name):
+        if name not in self._lanes:
+            self._lanes[name] = LaneQueues()
+        return self._lanes[name]
+
+    async def put(self, task, task_class: str = BACKGROUND):
+        """Queue a task. Safe to call from other event loops (e.g. scheduled jobs)."""
+        if self._loop and asyncio.get_running_loop() is not self._loop:
+            self._loop.call_soon_threadsafe(self.put_nowait, task, task_class)
+        else:
+            self.put_nowait(task, task_class)
+
+    def put_nowait(self, task, task_class: str = BACKGROUND):
+        if task_class not in TASK_CLASSES:
+            logger.warning(f"⚠️ Unknown task class '{task_class}', using background")
+            task_class = BACKGROUND
+
+        if self.journal and task.durable and task.journal_id is None:
+            try:
+                task.journal_id = self.journal.append(task, task_class)
+            except Exception as e:
+                logger.error(f"❌ Could not journal task {task}: {e}")
+
+        task.task_class = task_class
+        lane = self._lane(
+            self._resolve_lane(task) if self._resolve_lane else DEFAULT_LANE
+        )
+        lane.queues[task_class].append((time.monotonic(), task))
+        self._metrics[task_class].enqueued += 1
+        self._unfinished += 1
+        lane.not_empty.set()
+
+    def _select(self, lane: LaneQueues):
+        now = time.monotonic()
+        top = next((c for c in TASK_CLASSES if lane.queues[c]), None)
+        if top is None or lane.promoted_last:
+            return top, False
+
+        # Serve the longest-waiting class that exceeded its maximum wait
+        starving = [
+            task_class
+            for task_class in TASK_CLASSES
+            if task_class != top
+            and lane.queues[task_class]
+            and now - lane.queues[task_class][0][0]
+            > self.max_wait.get(task_class, float("inf"))
+        ]
+        if starving:
+            return min(starving, key=lambda c: lane.queues[c][0][0]), True
+        return top, False
+
+    async def get(self, lane_name: str = DEFAULT_LANE):
+        """Remove and return the next task of a lane."""
+        self._loop = self._loop or asyncio.get_running_loop()
+        lane = self._lane(lane_name)
+
+        while True:
+            task_class, starved = self._select(lane)
+            if task_class:
+                break
+            lane.not_empty.clear()
+            await lane.not_empty.wait()
+
+        enqueued_at, task = lane.queues[task_class].popleft()
+        wait = time.monotonic() - enqueued_at
+
+        metrics = self._metrics[task_class]
+        metrics.dequeued += 1
+        metrics.total_wait += wait
+        metrics.max_wait = max(metrics.max_wait, wait)
+        if starved:
+            metrics.starved += 1
+        lane.promoted_last = starved
+
+        return task
+
+    def task_done(self, task=None, succeeded: bool = True):
+        """
+        Mark a task as processed. Durable tasks are acknowledged in the journal
+        when they succeeded and retried later when their handler failed.
+        """
+        self._unfinished = max(0, self._unfinished - 1)
+        if task is None:
+            return
+
+        if not succeeded and task.durable:
+            task.attempts += 1
+            if task.attempts < config.EVENT_QUEUE_MAX_ATTEMPTS:
+                self._retry(task)
+                return
+            logger.error(f"❌ Giving up on {task} after {task.attempts} attempts")
+
+        if self.journal and task.journal_id is not None:
+            try:
+                self.journal.ack(task.journal_id)
+            except Exception as e:
+                logger.error(f"❌ Could not acknowledge task {task}: {e}")
+
+    def _retry(self, task):
+        """Keep a failed durable task in the journal and queue it again later."""
+        if self.journal and task.journal_id is not None:
+            try:
+                self.journal.fail(task.journal_id, task.attempts)
+            except Exception as e:
+                logger.error(f"❌ Could not record failed task {task}: {e}")
+
+        delay = config.EVENT_QUEUE_RETRY_DELAY
+        logger.warning(
+            f"🔁 Retrying {task} in {delay}s "
+            f"(attempt {task.attempts + 1}/{config.EVENT_QUEUE_MAX_ATTEMPTS})"
+        )
+        asyncio.get_running_loop().call_later(
+            delay, self.put_nowait, task, task.task_class
+        )
+
+    def qsize(self, lane_name: str = None):
+        if lane_name:
+            return len(self._lanes.get(lane_name, ()))
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def metrics(self):
+        """Depth and wait-time metrics per task class."""
+        now = time.monotonic()
+        result = {}
+        for task_class in TASK_CLASSES:
+            queues = [
+                lane.queues[task_class]
+                for lane in self._lanes.values()
+                if lane.queues[task_class]
+            ]
+            metrics = self._metrics[task_class]
+            result[task_class] = {
+                "depth": sum(len(queue) for queue in queues),
+                "oldest_wait": round(
+                    max((now - queue[0][0] for queue in queues), default=0.0), 3
+                ),
+                "enqueued": metrics.enqueued,
+                "dequeued": metrics.dequeued,
+                "avg_wait": (
+                    round(metrics.total_wait / metrics.dequeued, 3)
+                    if metrics.dequeued
+                    else 0.0
+                ),
+                "max_wait": round(metrics.max_wait, 3),
+                "starvation_promotions": metrics.starved,
+            }
+        result["unfinished"] = self._unfinished
+        return result
@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Optional
+
+
+@dataclass(slots=True)
+class QueuedTask:
+    """
+    Base of all event queue tasks.
+
+    A producer that needs the outcome calls `track()` before queueing the task
+    and awaits the returned future. The processor resolves it with the
+    handler's return value or exception; cancelling the future skips a task
+    that has not started yet and cancels one that is running.
+
+    Durable task types are written to the event queue journal and replayed
+    after a restart until they were processed. A durable task whose handler
+    raised is queued again later, up to `EVENT_QUEUE_MAX_ATTEMPTS` times.
+    """
+
+    durable: ClassVar[bool] = False
+
+    future: Optional[asyncio.Future] = field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+    started_at: Optional[float] = field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+    journal_id: Optional[int] = field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+    task_class: Optional[str] = field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+    attempts: int = field(default=0, kw_only=True, repr=False, compare=False)
+
+    def track(self) -> asyncio.Future:
+        """Create the result future in the caller's event loop."""
+        if self.future is None:
+            self.future = asyncio.get_running_loop().create_future()
+        return self.future
+
+    def cancelled(self) -> bool:
+        return self.future is not None and self.future.cancelled()
+
+    def set_result(self, result):
+        self._settle("set_result", result)
+
+    def set_exception(self, exception: BaseException):
+        self._settle("set_exception", exception)
+
+    def _settle(self, method: str, value):
+        future = self.future
+        if future is None:
+            return
+
+        def settle():
+            if not future.done():
+                getattr(future, method)(value)
+
+        # The producer may live in another event loop (e.g. scheduled jobs)
+        loop = future.get_loop()
+        try:
+            same_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            same_loop = False
+
+        if same_loop:
+            settle()
+        else:
+            loop.call_soon_threadsafe(settle)
+
+
+@dataclass(slots=True)
+class FunctionTask(QueuedTask):
+    """Call a function from the function registry."""
+
+    name: str
+    data: Any = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class PrintCommandTask(QueuedTask):
+    """Print a Chatogram redemption and fulfil it."""
+
+    durable: ClassVar[bool] = True
+
+    command: str
+    user_id: int
+    user: str
+    message: str
+    redeem_id: str
+    reward_id: str
+
+
+@dataclass(slots=True)
+class HeatClickTask(QueuedTask):
+    """A click on the overlay received from the Heat API."""
+
+    user_id: str
+    x: int
+    y: int
+    object_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CreateRedemptionTask(QueuedTask):
+    """Create a custom channel point reward."""
+
+    durable: ClassVar[bool] = True
+
+    title: str
+    cost: int
+
+
+# Task types that survive restarts, by name (see modules/queues/journal.py)
+DURABLE_TASKS = {
+    task_type.__name__: task_type
+    for task_type in (PrintCommandTask, CreateRedemptionTask)
+}
@@ -5,6 +5,7 @@ from database.crud.scheduled_jobs import get_scheduled_job_by_id
 from database.crud.scheduled_messages import get_random_message_from_category
 from modules.websocket_handler import broadcast_message
 from modules.sequence_runner import execute_sequence
+from modules.queues.chat_queue import PRIORITY_LOW
 
 logger = logging.getLogger("uvicorn.error.scheduled_jobs")
 
@@ -42,7 +43,7 @@ async def process_scheduled_job(job_id: int, app):
                     return
 
             if message_text:
-                await twitch_chat.send_message(message_text)
+                await twitch_chat.send_message(message_text, priority=PRIORITY_LOW)
                 logger.info(f"✅ Sent scheduled message: {message_text}")
 
         # ─── Execute Sequence ────────────────────────────────────
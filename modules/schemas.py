@@ -55,6 +55,7 @@ class ClickableObject(BaseModel):
     y: int
     width: int
     height: int
+    z: Optional[int] = 0  # Stacking order, higher values are on top
     iconClass: Optional[str] = None  # Optional FontAwesome class
     html: Optional[str] = None
 
@@ -0,0 +1,228 @@
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import config
+
+# `{random(min, max)}` or `$$variable`
+TEMPLATE_TOKEN = re.compile(r"\{random\((\d+),\s*(\d+)\)\}|\$\$(\w+)")
+
+# How a `parallel` step joins its branches
+JOIN_POLICIES = ("all", "any", "first_error")
+
+# What happens when a sequence is triggered while it is still running
+RETRIGGER_POLICIES = ("replace", "ignore", "parallel")
+
+
+class SequenceError(ValueError):
+    """Raised for sequences that cannot be compiled."""
+
+
+@dataclass(slots=True)
+class CompiledStep:
+    """A sequence step with its data pre-compiled into a render function."""
+
+    type: str
+    render: Callable[[dict], Any]
+    then: tuple = ()
+    otherwise: tuple = ()
+    branches: tuple = ()
+
+
+@dataclass(slots=True)
+class CompiledSequence:
+    name: str
+    steps: tuple
+    retrigger: str = config.SEQUENCE_RETRIGGER_POLICY
+    debounce: float = 0.0
+
+
+def _constant(value):
+    return lambda context: value
+
+
+def _mark_constant(value):
+    render = _constant(value)
+    render.constant = True
+    return render
+
+
+def _random(low: int, high: int):
+    return lambda context: str(random.randint(low, high))
+
+
+def _variable(name: str, original: str, as_text: bool):
+    # Unknown variables keep their placeholder
+    if as_text:
+        return lambda context: str(context.get(name, original))
+    return lambda context: context.get(name, original)
+
+
+def compile_template(value, path: str = ""):
+    """
+    Compile step data into `render(context) -> data`.
+
+    Strings are split once into literal parts, `{random(min, max)}` and
+    `$$variable` placeholders. Values without placeholders render as
+    constants, so rendering does no parsing or regex work.
+    """
+    if isinstance(value, dict):
+        items = [
+            (key, compile_template(item, f"{path}.{key}"))
+            for key, item in value.items()
+        ]
+        if all(getattr(render, "constant", False) for _, render in items):
+            return _mark_constant(value)
+        return lambda context: {key: render(context) for key, render in items}
+
+    if isinstance(value, list):
+        items = [
+            compile_template(item, f"{path}[{i}]") for i, item in enumerate(value)
+        ]
+        if all(getattr(render, "constant", False) for render in items):
+            return _mark_constant(value)
+        return lambda context: [render(context) for render in items]
+
+    if not isinstance(value, str):
+        return _mark_constant(value)
+
+    tokens = list(TEMPLATE_TOKEN.finditer(value))
+    if not tokens:
+        return _mark_constant(value)
+
+    # A lone variable keeps the type of its context value
+    if len(tokens) == 1 and tokens[0].group(3) and tokens[0].group(0) == value:
+        return _variable(tokens[0].group(3), value, as_text=False)
+
+    parts = []
+    position = 0
+    for token in tokens:
+        if token.start() > position:
+            parts.append(_constant(value[position : token.start()]))
+
+        if token.group(3):
+            parts.append(_variable(token.group(3), token.group(0), as_text=True))
+        else:
+            low, high = int(token.group(1)), int(token.group(2))
+            if low > high:
+                raise SequenceError(f"{path}: random range {low} > {high}")
+            parts.append(_random(low, high))
+        position = token.end()
+
+    if position < len(value):
+        parts.append(_constant(value[position:]))
+
+    return lambda context: "".join([part(context) for part in parts])
+
+
+def _require(data, key: str, types, path: str):
+    if not isinstance(data, dict) or not isinstance(data.get(key), types):
+        raise SequenceError(f"{path}: '{key}' is missing or invalid")
+
+
+def compile_step(step, path: str) -> CompiledStep:
+    """Validate and compile a single step."""
+    if not isinstance(step, dict) or not isinstance(step.get("type"), str):
+        raise SequenceError(f"{path}: step needs a 'type'")
+
+    step_type = step["type"]
+    data = step.get("data", {})
+
+    if step_type == "sleep":
+        if isinstance(data, bool) or not isinstance(data, (int, float)):
+            raise SequenceError(f"{path}: sleep needs a number of seconds")
+
+    elif step_type == "if":
+        _require(data, "condition", str, path)
+        then_steps = data.get("then") or []
+        else_steps = data.get("else") or []
+        if not isinstance(then_steps, list) or not isinstance(else_steps, list):
+            raise SequenceError(f"{path}: 'then' and 'else' must be lists of steps")
+
+        return CompiledStep(
+            type=step_type,
+            render=compile_template({"condition": data["condition"]}, path),
+            then=compile_steps(then_steps, f"{path}.then"),
+            otherwise=compile_steps(else_steps, f"{path}.else"),
+        )
+
+    elif step_type == "parallel":
+        _require(data, "branches", list, path)
+        branches = data["branches"]
+        if not branches or not all(isinstance(branch, list) for branch in branches):
+            raise SequenceError(f"{path}: 'branches' must be a list of step lists")
+
+        join = data.get("join", "all")
+        if join not in JOIN_POLICIES:
+            raise SequenceError(f"{path}: 'join' must be one of {JOIN_POLICIES}")
+
+        return CompiledStep(
+            type=step_type,
+            render=compile_template({"join": join}, path),
+            branches=tuple(
+                compile_steps(branch, f"{path}.branches[{i}]")
+                for i, branch in enumerate(branches)
+            ),
+        )
+
+    elif step_type == "call_function":
+        _require(data, "name", str, path)
+        if "timeout" in data and not isinstance(data["timeout"], (int, float)):
+            raise SequenceError(f"{path}: 'timeout' must be a number")
+
+    elif step_type == "set_condition":
+        _require(data, "name", str, path)
+        if "ttl" in data and not isinstance(data["ttl"], (int, float)):
+            raise SequenceError(f"{path}: 'ttl' must be a number")
+
+    elif step_type == "todo":
+        _require(data, "action", str, path)
+
+    elif step_type == "update_job":
+        _require(data, "job_id", (str, int), path)
+
+    elif step_type == "random_message":
+        _require(data, "category", str, path)
+
+    return CompiledStep(type=step_type, render=compile_template(data, path))
+
+
+def compile_steps(steps, path: str) -> tuple:
+    return tuple(compile_step(step, f"{path}[{i}]") for i, step in enumerate(steps))
+
+
+def compile_sequence(name: str, definition) -> CompiledSequence:
+    """
+    Compile a sequence given as a list of steps, or as a mapping with `steps`
+    and the optional `retrigger` policy and `debounce` delay (seconds).
+    """
+    if isinstance(definition, list):
+        return CompiledSequence(name, compile_steps(definition, name))
+
+    if not isinstance(definition, dict) or not isinstance(
+        definition.get("steps"), list
+    ):
+        raise SequenceError(f"{name}: a sequence must be a list of steps")
+
+    retrigger = definition.get("retrigger", config.SEQUENCE_RETRIGGER_POLICY)
+    if retrigger not in RETRIGGER_POLICIES:
+        raise SequenceError(f"{name}: 'retrigger' must be one of {RETRIGGER_POLICIES}")
+
+    debounce = definition.get("debounce", 0)
+    if isinstance(debounce, bool) or not isinstance(debounce, (int, float)):
+        raise SequenceError(f"{name}: 'debounce' must be a number of seconds")
+
+    return CompiledSequence(
+        name, compile_steps(definition["steps"], name), retrigger, float(debounce)
+    )
+
+
+def compile_sequences(raw) -> dict:
+    """Compile all sequences of a sequences file; raises SequenceError."""
+    if not isinstance(raw, dict):
+        raise SequenceError("'sequences' must be a mapping of names to step lists")
+
+    return {
+        name: compile_sequence(name, definition) for name, definition in raw.items()
+    }
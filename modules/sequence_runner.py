@@ -1,11 +1,20 @@
 import asyncio
+import itertools
+import time
 import yaml
-import re
-import random
 import logging
 import config
 from modules.websocket_handler import broadcast_message
+from modules.sequence_compiler import CompiledStep, compile_sequences
+from modules.sequence_trace import (
+    begin_step,
+    end_step,
+    record_queue_wait,
+    start_trace,
+)
 from modules.state_manager import check_condition, set_condition
+from modules.queues.priority_queue import BACKGROUND
+from modules.queues.tasks import FunctionTask
 from database.crud.todos import complete_todo
 from database.crud.scheduled_jobs import update_scheduled_job
 from database.crud.scheduled_messages import get_random_message_from_category
@@ -14,17 +23,23 @@ logger = logging.getLogger("uvicorn.error.sequence_runner")
 
 
 # Load sequences from YAML
-def load_sequences():
+def load_sequences(path: str = config.SEQUENCES_FILE):
+    """Read and compile the sequences file. Raises on invalid sequences."""
+    with open(path, "r", encoding="utf-8") as file:
+        data = yaml.safe_load(file) or {}
+    return compile_sequences(data.get("sequences") or {})
+
+
+def _initial_sequences():
     try:
-        with open(config.SEQUENCES_FILE, "r") as file:
-            return yaml.safe_load(file).get("sequences", {})
+        return load_sequences()
     except Exception as e:
         logger.error(f"❌ Failed to load sequences: {e}")
         return {}
 
 
-# Store sequences in memory
-ACTION_SEQUENCES = load_sequences()
+# Store compiled sequences in memory
+ACTION_SEQUENCES = _initial_sequences()
 
 
 def get_sequence_names():
@@ -32,30 +47,149 @@ def get_sequence_names():
     return list(ACTION_SEQUENCES.keys())
 
 
-async def execute_sequence(action: str, event_queue, context: dict = {}):
-    """Execute a predefined sequence using the global event queue from `app.state`."""
-    if action not in ACTION_SEQUENCES:
+def has_sequence(action: str) -> bool:
+    return action in ACTION_SEQUENCES
+
+
+class SequenceRun:
+    """Handle of a running sequence."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str):
+        self.id = f"{name}-{next(self._ids)}"
+        self.name = name
+        self.started_at = time.time()
+        self.task = None
+
+    def cancel(self):
+        # Runs started by scheduled jobs live in another event loop
+        self.task.get_loop().call_soon_threadsafe(self.task.cancel)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "running_for": round(time.time() - self.started_at, 3),
+        }
+
+
+# Currently running sequences by run id
+RUNNING_SEQUENCES = {}
+
+
+def get_running_sequences(name: str = None):
+    """Return the running sequences, optionally only those of one sequence."""
+    return [
+        run
+        for run in list(RUNNING_SEQUENCES.values())
+        if name is None or run.name == name
+    ]
+
+
+def cancel_sequence(name_or_id: str):
+    """Cancel a run by id, or all runs of a sequence by name."""
+    run = RUNNING_SEQUENCES.get(name_or_id)
+    runs = [run] if run else get_running_sequences(name_or_id)
+    for run in runs:
+        logger.info(f"🛑 Cancelling sequence run {run.id}")
+        run.cancel()
+    return runs
+
+
+def start_sequence(action: str, event_queue, context: dict = None, debounce: float = None):
+    """
+    Start a sequence in the background and return its run handle.
+
+    If the sequence is already running, its retrigger policy decides: `replace`
+    cancels the running one, `ignore` drops the new trigger (returns None) and
+    `parallel` runs both. A `debounce` delays the start, so with `replace`
+    only the last of several quick triggers runs.
+    """
+    sequence = ACTION_SEQUENCES.get(action)
+    if sequence is None:
         logger.warning(f"⚠️ Sequence '{action}' not found.")
-        return
+        return None
+
+    running = get_running_sequences(action)
+    if running and sequence.retrigger == "ignore":
+        logger.info(f"⏭️ Sequence '{action}' is already running, ignoring trigger.")
+        return None
+    if running and sequence.retrigger == "replace":
+        for run in running:
+            logger.info(f"🔁 Replacing running sequence {run.id}")
+            run.cancel()
+
+    run = SequenceRun(action)
+    run.task = asyncio.create_task(
+        run_sequence(
+            sequence,
+            event_queue,
+            context or {},
+            sequence.debounce if debounce is None else debounce,
+            run.id,
+        )
+    )
+    RUNNING_SEQUENCES[run.id] = run
+    run.task.add_done_callback(lambda _: RUNNING_SEQUENCES.pop(run.id, None))
+    return run
 
-    steps = ACTION_SEQUENCES[action]
 
-    for step in steps:
-        success = await execute_sequence_step(step, event_queue, context)
+async def execute_sequence(action: str, event_queue, context: dict = None):
+    """
+    Execute a predefined sequence using the global event queue from `app.state`.
 
-        if not success:
-            logger.error(
-                f"❌ Sequence '{action}' stopped due to an error in step: {step}"
-            )
-            await broadcast_message(
-                {
-                    "admin_alert": {
-                        "type": "error",
-                        "message": f"Sequence '{action}' failed",
-                    }
+    Returns whether the sequence ran successfully; a replaced or cancelled run
+    counts as not successful.
+    """
+    run = start_sequence(action, event_queue, context)
+    if run is None:
+        return False
+
+    try:
+        return await asyncio.shield(run.task)
+    except asyncio.CancelledError:
+        if run.task.cancelled():
+            return False
+        raise
+
+
+async def run_sequence(
+    sequence, event_queue, context: dict, debounce: float = 0, run_id: str = None
+):
+    """Run the steps of a compiled sequence and record its trace."""
+    action = sequence.name
+    trace = start_trace(run_id or action, action)
+
+    try:
+        if debounce:
+            token = begin_step("debounce")
+            try:
+                await asyncio.sleep(debounce)
+            except asyncio.CancelledError:
+                end_step(token, "cancelled")
+                raise
+            end_step(token, "ok")
+
+        success = await execute_steps(sequence.steps, event_queue, context)
+    except asyncio.CancelledError:
+        trace.finish("cancelled")
+        logger.info(f"🛑 Sequence '{action}' was cancelled.")
+        raise
+
+    trace.finish("ok" if success else "failed")
+
+    if not success:
+        logger.error(f"❌ Sequence '{action}' stopped due to an error.")
+        await broadcast_message(
+            {
+                "admin_alert": {
+                    "type": "error",
+                    "message": f"Sequence '{action}' failed",
                 }
-            )
-            break
+            }
+        )
 
     await broadcast_message(
         {
@@ -65,182 +199,234 @@ async def execute_sequence(action: str, event_queue, context: dict = {}):
             }
         }
     )
+    return success
+
+
+async def execute_steps(steps, event_queue, context: dict):
+    """Execute steps in order, stopping at the first failure."""
+    for step in steps:
+        if not await execute_sequence_step(step, event_queue, context):
+            return False
+    return True
+
+
+async def execute_sequence_step(step: CompiledStep, event_queue, context: dict):
+    """Execute a single compiled sequence step using the shared event queue."""
+    handler = STEP_HANDLERS.get(step.type, run_overlay_step)
+    token = begin_step(step.type)
+    success = False
+
+    try:
+        success = await handler(step, step.render(context), event_queue, context)
+        return success
+    except asyncio.CancelledError:
+        end_step(token, "cancelled")
+        token = None
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error executing step '{step.type}': {e}")
+        return False
+    finally:
+        end_step(token, "ok" if success else "failed")
 
 
-async def execute_sequence_step(step, event_queue, context: dict):
-    """Execute a single sequence step using the shared event queue."""
-    step_type = step.get("type")
-    step_data = resolve_random_values(step.get("data", {}))
-    step_data = resolve_variables(step_data, context)
+async def run_sleep(step, delay_time, event_queue, context):
+    logger.info(f"⏳ Waiting {delay_time} seconds...")
+    await asyncio.sleep(delay_time)
+    return True
+
+
+async def run_if(step, step_data, event_queue, context):
+    condition_name = step_data["condition"]
+
+    if check_condition(condition_name):
+        logger.info(f"✅ Condition '{condition_name}' is TRUE, executing THEN block.")
+        return await execute_steps(step.then, event_queue, context)
+
+    logger.info(f"❌ Condition '{condition_name}' is FALSE, executing ELSE block.")
+    return await execute_steps(step.otherwise, event_queue, context)
+
+
+async def run_parallel(step, step_data, event_queue, context):
+    """
+    Run the branches of a `parallel` step concurrently.
+
+    `all` waits for every branch and succeeds if all did, `any` succeeds with
+    the first successful branch and `first_error` fails with the first failed
+    branch. Branches still running when the result is known are cancelled.
+    """
+    join = step_data["join"]
+    branches = [
+        asyncio.create_task(execute_steps(branch, event_queue, context))
+        for branch in step.branches
+    ]
 
     try:
-        # Handle delays
-        if step_type == "sleep":
-            delay_time = step_data if isinstance(step_data, (int, float)) else 1
-            logger.info(f"⏳ Waiting {delay_time} seconds...")
-            await asyncio.sleep(delay_time)
-            return True
-
-        # Handle if-else conditions
-        if step_type == "if":
-            condition_name = step_data.get("condition")
-            then_steps = step_data.get("then", [])
-            else_steps = step_data.get("else", [])
-
-            if check_condition(condition_name):
-                logger.info(
-                    f"✅ Condition '{condition_name}' is TRUE, executing THEN block."
-                )
-                for then_step in then_steps:
-                    success = await execute_sequence_step(
-                        then_step, event_queue, context
-                    )
-                    if not success:
-                        return False
-            else:
-                logger.info(
-                    f"❌ Condition '{condition_name}' is FALSE, executing ELSE block."
-                )
-                for else_step in else_steps:
-                    success = await execute_sequence_step(
-                        else_step, event_queue, context
-                    )
-                    if not success:
-                        return False
-            return True
-
-        # Handle function calls via event queue
-        if step_type == "call_function":
-            function_name = step_data.get("name")
-            parameters = step_data.get("parameters", {})
-
-            task = {"function": function_name, "data": parameters}
-            await event_queue.put(task)
-            logger.info(
-                f"🔄 Queued function '{function_name}' with parameters: {parameters}"
+        if join == "all":
+            return all(await asyncio.gather(*branches))
+
+        pending = set(branches)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
             )
+            for branch in done:
+                if join == "any" and branch.result():
+                    return True
+                if join == "first_error" and not branch.result():
+                    return False
+        return join == "first_error"
+    finally:
+        for branch in branches:
+            branch.cancel()
+
+
+async def run_call_function(step, step_data, event_queue, context):
+    """Handle function calls via event queue"""
+    function_name = step_data.get("name")
+    parameters = step_data.get("parameters", {})
+
+    task = FunctionTask(name=function_name, data=parameters)
+
+    # `wait: false` queues the function without waiting for its result
+    if not step_data.get("wait", True):
+        await event_queue.put(task, BACKGROUND)
+        logger.info(f"🔄 Queued function '{function_name}' without waiting")
+        return True
+
+    task.track()
+    await event_queue.put(task, BACKGROUND)
+    logger.info(f"🔄 Queued function '{function_name}' with parameters: {parameters}")
+
+    # Check if function succeeds
+    success = await wait_for_task_success(
+        task, step_data.get("timeout", config.SEQUENCE_STEP_TIMEOUT)
+    )
+    if not success:
+        logger.error(f"❌ Function '{function_name}' failed, stopping sequence.")
+        return False
+    return True
+
+
+async def run_set_condition(step, step_data, event_queue, context):
+    condition_name = step_data.get("name")
+    condition_value = step_data.get("value", True)
+    set_condition(condition_name, condition_value, step_data.get("ttl"))
+    return True
+
+
+async def run_todo(step, step_data, event_queue, context):
+    """Handle ToDo actions using CRUD"""
+    action = step_data.get("action")
+    todo_id = step_data.get("todo_id")
+
+    if action == "remove":
+        complete_todo(todo_id)
+
+    await broadcast_message({"todo": {"action": action, "id": todo_id}})
+    logger.info(f"✅ Processed ToDo action: {action} (ID: {todo_id})")
+    return True
+
+
+async def run_update_job(step, step_data, event_queue, context):
+    """Handle scheduled job updates"""
+    job_id = step_data.get("job_id")
+    new_data = step_data.get("new_data", {})
 
-            # Check if function succeeds
-            success = await wait_for_task_success(task, event_queue)
-            if not success:
-                logger.error(
-                    f"❌ Function '{function_name}' failed, stopping sequence."
-                )
-                return False
-            return True
-
-        # Handle setting conditions
-        if step_type == "set_condition":
-            condition_name = step_data.get("name")
-            condition_value = step_data.get("value", True)
-            set_condition(condition_name, condition_value)
-            logger.info(f"🔄 Set condition '{condition_name}' to {condition_value}")
-            return True
-
-        # Handle ToDo actions using CRUD
-        if step_type == "todo":
-            action = step_data.get("action")
-            todo_id = step_data.get("todo_id")
-
-            if action == "remove":
-                complete_todo(todo_id)
-
-            await broadcast_message({"todo": {"action": action, "id": todo_id}})
-            logger.info(f"✅ Processed ToDo action: {action} (ID: {todo_id})")
-            return True
-
-        # Handle scheduled job updates
-        if step_type == "update_job":
-            job_id = step_data.get("job_id")
-            new_data = step_data.get("new_data", {})
-
-            success = update_scheduled_job(job_id, **new_data)
-            if success:
-                logger.info(
-                    f"✅ Updated scheduled job {job_id} with new data: {new_data}"
-                )
-            else:
-                logger.error(f"❌ Failed to update scheduled job {job_id}")
-            return success
-
-        # Handle scheduled message retrieval
-        if step_type == "random_message":
-            category = step_data.get("category")
-            message = get_random_message_from_category(category)
-            if message:
-                await broadcast_message(
-                    {
-                        "overlay_event": {
-                            "action": "display_message",
-                            "data": {"message": message},
-                        }
-                    }
-                )
-                logger.info(
-                    f"✅ Displayed random message from category '{category}': {message}"
-                )
-            else:
-                logger.warning(f"⚠️ No messages found in category '{category}'")
-            return True
-
-        # Handle overlay events
+    success = update_scheduled_job(job_id, **new_data)
+    if success:
+        logger.info(f"✅ Updated scheduled job {job_id} with new data: {new_data}")
+    else:
+        logger.error(f"❌ Failed to update scheduled job {job_id}")
+    return success
+
+
+async def run_random_message(step, step_data, event_queue, context):
+    """Handle scheduled message retrieval"""
+    category = step_data.get("category")
+    message = get_random_message_from_category(category)
+    if message:
         await broadcast_message(
-            {"overlay_event": {"action": step_type, "data": step_data}}
+            {
+                "overlay_event": {
+                    "action": "display_message",
+                    "data": {"message": message},
+                }
+            }
         )
-        logger.info(f"✅ Executed overlay action: {step_type} with data: {step_data}")
-        return True
+        logger.info(
+            f"✅ Displayed random message from category '{category}': {message}"
+        )
+    else:
+        logger.warning(f"⚠️ No messages found in category '{category}'")
+    return True
+
+
+async def run_overlay_step(step, step_data, event_queue, context):
+    """Handle overlay events"""
+    await broadcast_message({"overlay_event": {"action": step.type, "data": step_data}})
+    logger.info(f"✅ Executed overlay action: {step.type} with data: {step_data}")
+    return True
+
+
+STEP_HANDLERS = {
+    "sleep": run_sleep,
+    "if": run_if,
+    "parallel": run_parallel,
+    "call_function": run_call_function,
+    "set_condition": run_set_condition,
+    "todo": run_todo,
+    "update_job": run_update_job,
+    "random_message": run_random_message,
+}
+
 
+async def wait_for_task_success(task, timeout: float = config.SEQUENCE_STEP_TIMEOUT):
+    """
+    Wait for a tracked task to complete and return whether it succeeded.
+
+    A task fails if it raises, returns a result with `"status": "error"` or
+    does not finish within `timeout` seconds. On timeout the task is cancelled,
+    so a step that is still queued never runs after its sequence gave up.
+    """
+    queued_at = time.monotonic()
+    name = getattr(task, "name", type(task).__name__)
+
+    try:
+        result = await asyncio.wait_for(task.future, timeout)
+    except asyncio.TimeoutError:
+        state = "running" if task.started_at else "queued"
+        logger.error(f"⏰ Task '{name}' timed out after {timeout}s ({state})")
+        record_queue_wait((task.started_at or time.monotonic()) - queued_at)
+        return False
     except Exception as e:
-        logger.error(f"❌ Error executing step '{step_type}': {e}")
+        logger.error(f"❌ Task '{name}' failed: {e}")
         return False
 
+    finished_at = time.monotonic()
+    started_at = task.started_at or queued_at
+    record_queue_wait(started_at - queued_at)
+    logger.info(
+        f"⏱️ Task '{name}' finished in {(finished_at - queued_at) * 1000:.0f} ms "
+        f"(queued {(started_at - queued_at) * 1000:.0f} ms)"
+    )
 
-async def wait_for_task_success(task, event_queue):
-    """Wait for a task to complete and return whether it succeeded."""
-    return True  # Placeholder for real task validation
+    if isinstance(result, dict) and result.get("status") == "error":
+        logger.error(f"❌ Task '{name}' returned an error: {result.get('message')}")
+        return False
+    return True
 
 
 async def reload_sequences():
-    """Reload sequences from YAML file."""
+    """Reload sequences from YAML file, keeping the current ones if it is invalid."""
     global ACTION_SEQUENCES
-    ACTION_SEQUENCES = load_sequences()
-    logger.info("🔄 Sequences reloaded successfully.")
 
+    try:
+        sequences = await asyncio.to_thread(load_sequences)
+    except Exception as e:
+        logger.error(f"❌ Sequences not reloaded, keeping the current ones: {e}")
+        return {"status": "error", "message": str(e)}
 
-def resolve_random_values(data):
-    """Parses strings for `{random(min, max)}` and replaces with a random number."""
-    if isinstance(data, dict):
-        return {key: resolve_random_values(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [resolve_random_values(item) for item in data]
-    elif isinstance(data, str):
-        matches = re.findall(r"{random\((\d+),\s*(\d+)\)}", data)
-        for match in matches:
-            min_val, max_val = map(int, match)
-            random_value = random.randint(min_val, max_val)
-            data = data.replace(f"{{random({min_val}, {max_val})}}", str(random_value))
-        return data
-    return data
-
-
-def resolve_variables(data, context):
-    """Recursively replace placeholders ($$variable) with actual values from the context dictionary."""
-    if isinstance(data, dict):
-        return {key: resolve_variables(value, context) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [resolve_variables(item, context) for item in data]
-    elif isinstance(data, str):
-        return replace_variables_in_string(data, context)
-    return data
-
-
-def replace_variables_in_string(text, context):
-    """Replace all occurrences of $$variables in a string using the provided context."""
-
-    def replace_match(match):
-        variable_name = match.group(1)
-        return context.get(
-            variable_name, match.group(0)
-        )  # Keep the original if not found
-
-    return re.sub(r"\$\$(\w+)", replace_match, text)
+    ACTION_SEQUENCES = sequences
+    logger.info("🔄 Sequences reloaded successfully.")
+    return {"status": "success", "message": f"{len(sequences)} sequences loaded"}
@@ -0,0 +1,158 @@
+import contextvars
+import html
+import time
+from collections import deque
+
+import config
+
+# Traces of the last sequence runs, oldest first
+TRACES = deque(maxlen=config.SEQUENCE_TRACE_LIMIT)
+
+# Trace and step of the sequence run in the current task
+_current_trace = contextvars.ContextVar("sequence_trace", default=None)
+_current_span = contextvars.ContextVar("sequence_span", default=None)
+
+
+class Span:
+    __slots__ = ("step", "depth", "start", "end", "queue_wait", "status")
+
+    def __init__(self, step: str, depth: int, start: float):
+        self.step = step
+        self.depth = depth
+        self.start = start
+        self.end = None
+        self.queue_wait = None
+        self.status = "running"
+
+
+class SequenceTrace:
+    """Timing of one sequence run; times are milliseconds since the run started."""
+
+    def __init__(self, run_id: str, name: str):
+        self.id = run_id
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.status = "running"
+        self.spans = []
+
+    def _now(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self, status: str):
+        self.status = status
+        self.duration = self._now()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": _round(self.duration),
+            "status": self.status,
+            "steps": [
+                {
+                    "step": span.step,
+                    "depth": span.depth,
+                    "start_ms": _round(span.start),
+                    "end_ms": _round(span.end),
+                    "queue_wait_ms": _round(span.queue_wait),
+                    "status": span.status,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def start_trace(run_id: str, name: str) -> SequenceTrace:
+    """Start tracing the sequence run of the current task."""
+    trace = SequenceTrace(run_id, name)
+    TRACES.append(trace)
+    _current_trace.set(trace)
+    return trace
+
+
+def begin_step(step: str):
+    """Record the start of a step. Returns a token for `end_step`, or None."""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+
+    parent = _current_span.get()
+    span = Span(step, parent.depth + 1 if parent else 0, trace._now())
+    trace.spans.append(span)
+    return trace, span, _current_span.set(span)
+
+
+def end_step(token, status: str):
+    if token is None:
+        return
+
+    trace, span, reset = token
+    span.end = trace._now()
+    span.status = status
+    _current_span.reset(reset)
+
+
+def record_queue_wait(seconds: float):
+    """Attach the event queue wait of a `call_function` step to its span."""
+    span = _current_span.get()
+    if span is not None:
+        span.queue_wait = seconds * 1000
+
+
+def get_traces(name: str = None):
+    """Return the recorded traces, newest first."""
+    return [t for t in reversed(TRACES) if name is None or t.name == name]
+
+
+def get_trace(trace_id: str):
+    return next((t for t in TRACES if t.id == trace_id), None)
+
+
+STATUS_COLORS = {
+    "ok": "#16a34a",
+    "failed": "#dc2626",
+    "cancelled": "#a3a3a3",
+    "running": "#2563eb",
+}
+
+
+def render_flame_html(traces) -> str:
+    """Render traces as flame-style timelines, one bar per step."""
+    sections = []
+    for trace in traces:
+        total = trace.duration or trace._now() or 1
+        rows = max((span.depth for span in trace.spans), default=0) + 1
+
+        bars = []
+        for span in trace.spans:
+            end = span.end if span.end is not None else trace._now()
+            wait = f", queued {span.queue_wait:.0f} ms" if span.queue_wait else ""
+            label = html.escape(f"{span.step} {end - span.start:.0f} ms{wait}")
+            bars.append(
+                f'<div title="{label}" style="position:absolute;'
+                f"left:{span.start / total * 100:.2f}%;"
+                f"width:max({(end - span.start) / total * 100:.2f}%,2px);"
+                f"top:{span.depth * 22}px;height:20px;overflow:hidden;"
+                f"white-space:nowrap;font-size:11px;color:#fff;"
+                f'background:{STATUS_COLORS.get(span.status, "#525252")}">'
+                f"{label}</div>"
+            )
+
+        sections.append(
+            f"<h3>{html.escape(trace.id)} – {trace.status}, {total:.0f} ms</h3>"
+            f'<div style="position:relative;height:{rows * 22}px;'
+            f'background:#171717">{"".join(bars)}</div>'
+        )
+
+    return (
+        "<html><body style='font-family:sans-serif;background:#0a0a0a;color:#e5e5e5'>"
+        f"<h2>Sequence traces</h2>{''.join(sections) or '<p>No traces yet.</p>'}"
+        "</body></html>"
+    )
@@ -0,0 +1,100 @@
+import itertools
+from dataclasses import dataclass
+
+import config
+
+
+@dataclass(slots=True)
+class IndexedRect:
+    object_id: str
+    x: int
+    y: int
+    width: int
+    height: int
+    z: int
+    order: int
+    cells: tuple
+
+    def contains(self, x: int, y: int) -> bool:
+        return (
+            self.x <= x <= self.x + self.width and self.y <= y <= self.y + self.height
+        )
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the overlay canvas for hit testing rectangles.
+
+    Every object is registered in each cell it overlaps, so a hit test only
+    checks the objects of the clicked cell instead of all objects. Objects are
+    added and removed incrementally. When several objects contain a point, the
+    one with the highest `z` wins; on equal `z` the one added last, which the
+    overlay draws on top.
+    """
+
+    def __init__(
+        self,
+        width: int = config.OVERLAY_WIDTH,
+        height: int = config.OVERLAY_HEIGHT,
+        cell_size: int = config.SPATIAL_GRID_CELL_SIZE,
+    ):
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self._cells = {}
+        self._objects = {}
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, object_id: str):
+        return object_id in self._objects
+
+    def _column(self, x: int) -> int:
+        return min(max(int(x) // self.cell_size, 0), self.columns - 1)
+
+    def _row(self, y: int) -> int:
+        return min(max(int(y) // self.cell_size, 0), self.rows - 1)
+
+    def add(self, object_id: str, x: int, y: int, width: int, height: int, z=0):
+        """Add an object, replacing an existing one with the same id."""
+        self.remove(object_id)
+
+        cells = tuple(
+            (column, row)
+            for column in range(self._column(x), self._column(x + width) + 1)
+            for row in range(self._row(y), self._row(y + height) + 1)
+        )
+        rect = IndexedRect(
+            object_id, x, y, width, height, z or 0, next(self._order), cells
+        )
+        self._objects[object_id] = rect
+        for cell in cells:
+            self._cells.setdefault(cell, []).append(rect)
+
+    def remove(self, object_id: str) -> bool:
+        rect = self._objects.pop(object_id, None)
+        if rect is None:
+            return False
+
+        for cell in rect.cells:
+            bucket = self._cells[cell]
+            bucket.remove(rect)
+            if not bucket:
+                del self._cells[cell]
+        return True
+
+    def clear(self):
+        self._cells.clear()
+        self._objects.clear()
+
+    def hit(self, x: int, y: int):
+        """Return the id of the top-most object at `(x, y)`, or None."""
+        top = None
+        for rect in self._cells.get((self._column(x), self._row(y)), ()):
+            if rect.contains(x, y) and (
+                top is None or (rect.z, rect.order) > (top.z, top.order)
+            ):
+                top = rect
+        return top.object_id if top else None
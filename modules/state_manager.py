@@ -1,48 +1,180 @@
 import json
 import os
 import logging
+import threading
+import time
 import config
+from modules.misc import atomic_write_json
 
 logger = logging.getLogger("uvicorn.error.state_manager")
 
-CONDITIONS = {}
 
+class StateStore:
+    """
+    In-memory conditions and clickable objects with a debounced write-behind
+    to `state.json`.
+
+    Changes are collected for `write_delay` seconds and then written in one
+    atomic write (temp file, fsync, rename) from a timer thread, so neither a
+    burst of `set_condition` calls nor the disk blocks the event loop.
+    Conditions set with a `ttl` expire automatically.
+    """
+
+    def __init__(
+        self,
+        path: str = config.STATE_FILE,
+        write_delay: float = config.STATE_WRITE_DELAY,
+    ):
+        self.path = path
+        self.write_delay = write_delay
+        self.conditions = {}
+        self.expires = {}
+        self.clickables = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def load(self):
+        """Load conditions from the state file into memory."""
+        if not os.path.exists(self.path):
+            return
 
-def load_states():
-    """Load conditions from a file into memory."""
-    global CONDITIONS
-    if os.path.exists(config.STATE_FILE):
         try:
-            with open(config.STATE_FILE, "r") as file:
-                CONDITIONS = json.load(file)
-            logger.info("✅ Loaded conditions from state.json")
+            with open(self.path, "r") as file:
+                data = json.load(file)
         except json.JSONDecodeError:
             logger.warning("⚠️ Corrupt state.json file. Resetting states.")
-            CONDITIONS = {}
-    else:
-        CONDITIONS = {}
+            return
+
+        # Older files only contain the conditions
+        if "conditions" not in data:
+            data = {"conditions": data}
+
+        with self._lock:
+            self.conditions = data.get("conditions", {})
+            self.expires = data.get("expires", {})
+            self.clickables = data.get("clickables", {})
+        logger.info("✅ Loaded conditions from state.json")
+
+    def _expired(self, name: str, now: float) -> bool:
+        expires_at = self.expires.get(name)
+        if expires_at is None or expires_at > now:
+            return False
+
+        with self._lock:
+            self.conditions.pop(name, None)
+            self.expires.pop(name, None)
+        self._schedule_write()
+        logger.info(f"⌛ Condition '{name}' expired")
+        return True
+
+    def get(self, name: str, default=False):
+        if self._expired(name, time.time()):
+            return default
+        return self.conditions.get(name, default)
+
+    def set(self, name: str, value, ttl: float = None):
+        with self._lock:
+            self.conditions[name] = value
+            if ttl:
+                self.expires[name] = time.time() + ttl
+            else:
+                self.expires.pop(name, None)
+        self._schedule_write()
+
+    def all(self):
+        now = time.time()
+        for name in list(self.expires):
+            self._expired(name, now)
+        return dict(self.conditions)
+
+    def set_clickable(self, object_id: str, data: dict):
+        with self._lock:
+            self.clickables[object_id] = data
+        self._schedule_write()
+
+    def remove_clickable(self, object_id: str):
+        with self._lock:
+            self.clickables.pop(object_id, None)
+        self._schedule_write()
+
+    def replace_clickables(self, clickables: dict):
+        with self._lock:
+            self.clickables = dict(clickables)
+        self._schedule_write()
+
+    def _schedule_write(self):
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            data = {
+                "conditions": dict(self.conditions),
+                "expires": dict(self.expires),
+                "clickables": dict(self.clickables),
+            }
+
+        try:
+            atomic_write_json(self.path, data, indent=2)
+            logger.debug("✅ State saved to state.json")
+        except Exception as e:
+            logger.error(f"❌ Failed to save state.json: {e}")
+
+
+state_store = StateStore()
+
+
+def load_states():
+    """Load conditions and clickable objects from a file into memory."""
+    state_store.load()
 
 
 def save_states():
-    """Save conditions to a file."""
-    try:
-        with open(config.STATE_FILE, "w") as file:
-            json.dump(CONDITIONS, file, indent=2)
-        logger.info("✅ Conditions saved to state.json")
-    except Exception as e:
-        logger.error(f"❌ Failed to save state.json: {e}")
+    """Write pending state changes to the state file immediately."""
+    state_store.flush()
 
 
-def set_condition(name: str, value: bool):
-    """Set a condition in memory and persist it."""
-    CONDITIONS[name] = value
-    save_states()
-    logger.info(f"🔄 Condition '{name}' set to {value}")
+def set_condition(name: str, value: bool, ttl: float = None):
+    """Set a condition and persist it. With `ttl` it expires after that many seconds."""
+    state_store.set(name, value, ttl)
+    logger.info(
+        f"🔄 Condition '{name}' set to {value}" + (f" for {ttl}s" if ttl else "")
+    )
 
 
 def check_condition(name: str) -> bool:
     """Check if a condition exists and is True."""
-    return CONDITIONS.get(name, False)
+    return state_store.get(name, False)
+
+
+def get_conditions() -> dict:
+    """Return all conditions that have not expired."""
+    return state_store.all()
+
+
+def save_clickable(object_id: str, data: dict):
+    """Persist a clickable object so it is restored after a restart."""
+    state_store.set_clickable(object_id, data)
+
+
+def delete_clickable(object_id: str):
+    state_store.remove_clickable(object_id)
+
+
+def replace_clickables(clickables: dict):
+    state_store.replace_clickables(clickables)
+
+
+def get_saved_clickables() -> dict:
+    """Return the persisted clickable objects."""
+    return dict(state_store.clickables)
 
 
 # ✅ Load states on startup
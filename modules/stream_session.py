@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+import logging
+
+import config
+from database.crud.streams import save_stream_session
+
+logger = logging.getLogger("uvicorn.error.stream_session")
+
+
+def to_utc_iso(timestamp: datetime.datetime) -> str:
+    """Format a timestamp like the `timestamp` fields of chat and event documents."""
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat()
+
+
+class StreamSessionManager:
+    """
+    Tracks the currently running stream.
+
+    Sessions are opened and closed by EventSub `stream.online`/`stream.offline`;
+    polling `get_stream_info` catches missed notifications. The session id is
+    derived from Twitch's `started_at`, so both sources (and a restart during a
+    stream) agree on the same id, and ids sort chronologically.
+
+    EventSub runs in its own thread, so listeners are always called in the
+    app's event loop (captured in `start()`).
+    """
+
+    def __init__(self):
+        self.session = None
+        self._listeners = []
+        self._task = None
+        self._loop = None
+        self._offline_polls = 0
+
+    def add_listener(self, callback):
+        """Call `callback(session)` whenever a session starts or ends."""
+        self._listeners.append(callback)
+
+    def current_stream_id(self):
+        """Return the id of the running stream, or None while offline."""
+        return self.session["_id"] if self.session else None
+
+    def get_session(self):
+        return self.session
+
+    def _notify(self, session):
+        loop = self._loop
+        if loop is None:
+            self._call_listeners(session)
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            self._call_listeners(session)
+        else:
+            # A copy, the session may already have changed when they run
+            loop.call_soon_threadsafe(self._call_listeners, dict(session))
+
+    def _call_listeners(self, session):
+        for callback in self._listeners:
+            try:
+                callback(session)
+            except Exception as e:
+                logger.error(f"❌ Stream session listener failed: {e}")
+
+    def start_session(self, started_at: datetime.datetime, twitch_stream_id=None):
+        """Open the session for a stream that started at `started_at`."""
+        if started_at.tzinfo:
+            started_at = started_at.astimezone(datetime.timezone.utc)
+        session_id = f"stream_{started_at.strftime('%Y%m%dT%H%M%SZ')}"
+
+        if self.session and self.session["_id"] == session_id:
+            return self.session
+
+        if self.session:
+            self.end_session()
+
+        self.session = save_stream_session(
+            session_id, to_utc_iso(started_at), None, twitch_stream_id
+        ) or {
+            "_id": session_id,
+            "started_at": to_utc_iso(started_at),
+            "ended_at": None,
+            "twitch_stream_id": twitch_stream_id,
+        }
+        logger.info(f"🟢 Stream session started: {session_id}")
+        self._notify(self.session)
+        return self.session
+
+    def end_session(self, ended_at: datetime.datetime = None):
+        """Close the running session."""
+        if not self.session:
+            return None
+
+        session = self.session
+        session["ended_at"] = to_utc_iso(
+            ended_at or datetime.datetime.now(datetime.timezone.utc)
+        )
+        save_stream_session(
+            session["_id"],
+            session["started_at"],
+            session["ended_at"],
+            session.get("twitch_stream_id"),
+        )
+        self.session = None
+        logger.info(f"🔴 Stream session ended: {session['_id']}")
+        self._notify(session)
+        return session
+
+    async def poll(self, twitch_api):
+        """Reconcile the session with the current Helix stream state."""
+        stream_info = await twitch_api.get_stream_info()
+
+        if stream_info and stream_info.type == "live":
+            self._offline_polls = 0
+            self.start_session(stream_info.started_at, stream_info.id)
+        elif self.session:
+            # get_stream_info also returns None on API errors, so wait for a second miss
+            self._offline_polls += 1
+            if self._offline_polls >= 2:
+                self._offline_polls = 0
+                self.end_session()
+
+    async def run_polling(
+        self, twitch_api, interval: float = config.STREAM_SESSION_POLL_INTERVAL
+    ):
+        """Fallback for missed EventSub notifications."""
+        while True:
+            try:
+                if twitch_api.is_running:
+                    await self.poll(twitch_api)
+            except Exception as e:
+                logger.error(f"❌ Error polling stream state: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, twitch_api):
+        self._loop = asyncio.get_running_loop()
+        if not self._task:
+            self._task = asyncio.create_task(self.run_polling(twitch_api))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+stream_session = StreamSessionManager()
@@ -0,0 +1,232 @@
+import asyncio
+import datetime
+import heapq
+import logging
+from collections import Counter
+
+import config
+from database.crud.stream_stats import save_stream_stats, get_stream_stats
+
+logger = logging.getLogger("uvicorn.error.stream_stats")
+
+
+class StreamStatsAggregator:
+    """
+    Incremental chat statistics for the current stream.
+
+    Every chat message updates a handful of counters in O(1). The ranked
+    snapshot served to the outro overlay is rebuilt periodically, so reading it
+    never touches the counters or the database.
+
+    Chat messages arrive on twitchAPI's chat thread; they are handed to the
+    app's event loop (captured in `start()`), so the counters are only ever
+    touched there.
+    """
+
+    def __init__(self, top_n: int = config.STREAM_STATS_TOP_N):
+        self.top_n = top_n
+        self._task = None
+        self._loop = None
+        self.reset(None)
+
+    def reset(self, stream_id):
+        """Start counting for a new stream."""
+        self.stream_id = stream_id
+        self.names = {}
+        self.messages = Counter()
+        self.emotes = Counter()
+        self.replies = Counter()
+        self.minutes = Counter()
+        self.first_time_chatters = []
+        self._stale = False
+        self._dirty = False
+        self._snapshot = self._build_snapshot()
+
+    def record_message(
+        self,
+        stream_id: str,
+        user_id: str,
+        username: str,
+        emotes_used: int,
+        is_reply: bool,
+        is_first: bool,
+        timestamp: datetime.datetime = None,
+    ):
+        """Count a single chat message. Safe to call from other threads."""
+        timestamp = timestamp or datetime.datetime.utcnow()
+        args = (stream_id, user_id, username, emotes_used, is_reply, is_first)
+
+        loop = self._loop
+        if loop is None:
+            self._record(*args, timestamp)
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            self._record(*args, timestamp)
+        else:
+            loop.call_soon_threadsafe(self._record, *args, timestamp)
+
+    def _record(
+        self,
+        stream_id: str,
+        user_id: str,
+        username: str,
+        emotes_used: int,
+        is_reply: bool,
+        is_first: bool,
+        timestamp: datetime.datetime,
+    ):
+        if stream_id != self.stream_id:
+            self.switch_stream(stream_id)
+
+        self.names[user_id] = username
+        self.messages[user_id] += 1
+        if emotes_used:
+            self.emotes[user_id] += emotes_used
+        if is_reply:
+            self.replies[user_id] += 1
+        if is_first:
+            self.first_time_chatters.append(username)
+        self.minutes[timestamp.strftime("%Y-%m-%dT%H:%M")] += 1
+        self._stale = True
+        self._dirty = True
+
+    def switch_stream(self, stream_id):
+        if self.stream_id and self._dirty:
+            self.persist()
+
+        self.reset(stream_id)
+
+        if stream_id:
+            self.restore(get_stream_stats(stream_id))
+
+    def _top(self, counter: Counter, key: str):
+        return [
+            {"user_id": user_id, "username": self.names.get(user_id), key: count}
+            for user_id, count in heapq.nlargest(
+                self.top_n, counter.items(), key=lambda item: item[1]
+            )
+        ]
+
+    def _build_snapshot(self):
+        peak_minute = max(self.minutes.items(), key=lambda item: item[1], default=None)
+        return {
+            "stream_id": self.stream_id,
+            "updated_at": datetime.datetime.utcnow().isoformat(),
+            "total_messages": sum(self.messages.values()),
+            "total_emotes": sum(self.emotes.values()),
+            "total_replies": sum(self.replies.values()),
+            "unique_chatters": len(self.messages),
+            "top_chatters": self._top(self.messages, "messages"),
+            "top_emote_users": self._top(self.emotes, "emotes"),
+            "top_repliers": self._top(self.replies, "replies"),
+            "first_time_chatters": list(self.first_time_chatters),
+            "messages_per_minute": [
+                {"minute": minute, "count": count}
+                for minute, count in sorted(self.minutes.items())
+            ],
+            "peak_minute": (
+                {"minute": peak_minute[0], "count": peak_minute[1]}
+                if peak_minute
+                else None
+            ),
+        }
+
+    def refresh_snapshot(self):
+        """Rebuild the ranked snapshot from the counters."""
+        self._snapshot = self._build_snapshot()
+        self._stale = False
+        return self._snapshot
+
+    def get_snapshot(self):
+        """Return the last built snapshot."""
+        return self._snapshot
+
+    def persist(self):
+        """Save counters and snapshot of the current stream to CouchDB."""
+        if not self.stream_id:
+            return
+        if save_stream_stats(self.stream_id, self._export()) is not None:
+            self._dirty = False
+
+    def _export(self):
+        return {
+            "snapshot": self.refresh_snapshot(),
+            "counters": {
+                "names": dict(self.names),
+                "messages": dict(self.messages),
+                "emotes": dict(self.emotes),
+                "replies": dict(self.replies),
+                "minutes": dict(self.minutes),
+                "first_time_chatters": list(self.first_time_chatters),
+            },
+        }
+
+    def restore(self, doc: dict):
+        """Continue counting from a previously saved stream (e.g. after a restart)."""
+        counters = (doc or {}).get("counters")
+        if not counters:
+            return
+
+        self.names.update(counters.get("names", {}))
+        self.messages.update(counters.get("messages", {}))
+        self.emotes.update(counters.get("emotes", {}))
+        self.replies.update(counters.get("replies", {}))
+        self.minutes.update(counters.get("minutes", {}))
+        self.first_time_chatters.extend(counters.get("first_time_chatters", []))
+        self.refresh_snapshot()
+        logger.info(f"✅ Restored chat stats for stream {self.stream_id}")
+
+    async def run(
+        self,
+        refresh_interval: float = config.STREAM_STATS_REFRESH_INTERVAL,
+        persist_interval: float = config.STREAM_STATS_PERSIST_INTERVAL,
+    ):
+        """Periodically rebuild the snapshot and save it to the database."""
+        last_persist = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(refresh_interval)
+            try:
+                if self._stale:
+                    self.refresh_snapshot()
+
+                now = asyncio.get_running_loop().time()
+                if (
+                    self._dirty
+                    and self.stream_id
+                    and now - last_persist >= persist_interval
+                ):
+                    last_persist = now
+                    data = self._export()
+                    # Messages counted while saving mark the stats dirty again
+                    self._dirty = False
+                    saved = await asyncio.to_thread(
+                        save_stream_stats, self.stream_id, data
+                    )
+                    if saved is None:
+                        self._dirty = True
+            except Exception as e:
+                logger.error(f"❌ Failed to update stream stats: {e}")
+
+    def start(self):
+        """Start the periodic snapshot task."""
+        self._loop = asyncio.get_running_loop()
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+            logger.info("🚀 Stream stats aggregator started.")
+
+    def stop(self):
+        """Stop the periodic task and save the current counters."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._dirty:
+            self.persist()
+
+
+stream_stats = StreamStatsAggregator()
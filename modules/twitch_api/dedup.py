@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import config
+from modules.misc import atomic_write_json
+
+logger = logging.getLogger("uvicorn.error.twitch_api.dedup")
+
+
+def event_key(data) -> str:
+    """
+    Identify an EventSub notification.
+
+    Uses the EventSub message id; notifications without one (e.g. from the
+    mock server) are identified by a hash of their subscription and event.
+    """
+    metadata = getattr(data, "metadata", None)
+    message_id = getattr(metadata, "message_id", None)
+    if message_id:
+        return message_id
+
+    subscription_id = getattr(getattr(data, "subscription", None), "id", "")
+    event = data.to_dict() if hasattr(data, "to_dict") else data
+    payload = json.dumps(event, sort_keys=True, default=str)
+    return hashlib.sha1(f"{subscription_id}:{payload}".encode()).hexdigest()
+
+
+class EventDeduplicator:
+    """
+    Remembers recently seen EventSub notifications.
+
+    Keys are kept in insertion order together with their expiry, so dropping
+    expired and surplus keys only ever looks at the oldest entries. The window
+    is saved to disk in the background and loaded again on startup, so a
+    notification redelivered after a restart is still recognized.
+
+    `seen()` is called on the EventSub thread and the window is saved from
+    the event loop, so both go through a lock.
+    """
+
+    def __init__(
+        self,
+        path: str = config.EVENTSUB_DEDUP_FILE,
+        ttl: float = config.EVENTSUB_DEDUP_TTL,
+        max_size: int = config.EVENTSUB_DEDUP_SIZE,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._task = None
+        self.dropped = 0
+
+    def _expire(self, now: float):
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now and len(self._seen) <= self.max_size:
+                break
+            self._seen.popitem(last=False)
+            self._dirty = True
+
+    def seen(self, key: str) -> bool:
+        """Return True if `key` was seen within the window, otherwise remember it."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+
+            if key in self._seen:
+                self.dropped += 1
+                return True
+
+            self._seen[key] = now + self.ttl
+            if len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            self._dirty = True
+            return False
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            with self._lock:
+                for key, expires_at in sorted(entries.items(), key=lambda e: e[1]):
+                    self._seen[key] = expires_at
+                self._expire(time.time())
+            logger.info(f"📥 Loaded {len(self._seen)} recent EventSub message ids")
+        except Exception as e:
+            logger.error(f"❌ Failed to load EventSub dedup window: {e}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._dirty = False
+            return dict(self._seen)
+
+    def save(self, entries: dict = None):
+        atomic_write_json(self.path, self.snapshot() if entries is None else entries)
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        try:
+            await asyncio.to_thread(self.save, self.snapshot())
+        except Exception as e:
+            logger.error(f"❌ Failed to save EventSub dedup window: {e}")
+
+    async def run(self, interval: float = config.EVENTSUB_DEDUP_PERSIST_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self):
+        if not self._task:
+            self.load()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
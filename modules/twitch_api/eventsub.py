@@ -5,6 +5,9 @@ from modules.websocket_handler import broadcast_message
 from database.crud.events import save_event
 from database.crud.viewers import save_viewer
 from database.crud.overlay import save_overlay_data
+from modules.stream_session import stream_session
+from modules.twitch_api.dedup import EventDeduplicator, event_key
+from modules.queues.manager import alert_queue
 import datetime
 import config
 
@@ -20,10 +23,12 @@ class TwitchEventSub:
         self.users = users
         self.eventsub = None
         self.mock_commands = []  # Stores mock event commands for testing
+        self.dedup = EventDeduplicator()
 
     async def start_eventsub(self):
         """Initialize the WebSocket EventSub and subscribe to events."""
         try:
+            self.dedup.start()
             self.eventsub = EventSubWebsocket(
                 self.twitch,
                 connection_url="ws://127.0.0.1:8081/ws" if self.test_mode else None,
@@ -65,6 +70,8 @@ class TwitchEventSub:
                     self.handle_mod_action,
                 ),
                 "channel.ad.break.begin": (broadcaster_id, self.handle_ad_break),
+                "stream.online": (broadcaster_id, self.handle_stream_online),
+                "stream.offline": (broadcaster_id, self.handle_stream_offline),
             }
 
             # Events that are only available in real mode (not in mock testing)
@@ -106,10 +113,31 @@ class TwitchEventSub:
         except Exception as e:
             logger.error(f"❌ Error initializing EventSub WebSocket: {e}")
 
+    async def stop(self):
+        """Stop the EventSub WebSocket and save the dedup window."""
+        if self.eventsub:
+            await self.eventsub.stop()
+        await self.dedup.stop()
+
+    def _deduplicated(self, handler):
+        """Wrap a handler so redelivered notifications are dropped before it runs."""
+
+        async def handle(data):
+            if self.dedup.seen(event_key(data)):
+                logger.info(f"♻️ Dropped duplicate notification for {handler.__name__}")
+                return
+            await handler(data)
+
+        return handle
+
     async def _subscribe_event(self, event_name, *params):
         """Helper method to subscribe to an event and register a mock command if applicable."""
         try:
             logger.info(f"Subscribing to event: listen_{event_name.replace('.', '_')}")
+            params = [
+                self._deduplicated(param) if callable(param) else param
+                for param in params
+            ]
             event_id = await getattr(
                 self.eventsub, f"listen_{event_name.replace('.', '_')}"
             )(*params)
@@ -148,9 +176,7 @@ class TwitchEventSub:
         if not self.test_mode:
             save_overlay_data("last_follower", username)
 
-        await broadcast_message(
-            {"alert": {"type": "follower", "user": username, "size": 1}}
-        )
+        alert_queue.put({"type": "follower", "user": username, "size": 1})
 
     async def handle_subscribe(self, data: dict):
         """Handle new subscriptions."""
@@ -172,9 +198,9 @@ class TwitchEventSub:
         if not self.test_mode:
             save_overlay_data("last_subscriber", username)
 
-        await broadcast_message(
-            {"alert": {"type": "subscriber", "user": username, "size": 1}}
-        )
+        # Gifted subs are announced once by the gift event of the gifter
+        if not data.event.is_gift:
+            alert_queue.put({"type": "subscriber", "user": username, "size": 1})
 
     async def handle_gift_sub(self, data: dict):
         """Handle gifted subscriptions."""
@@ -194,9 +220,7 @@ class TwitchEventSub:
             "gift_sub", int(data.event.user_id), f"Gifted {recipient_count} subs"
         )
 
-        await broadcast_message(
-            {"alert": {"type": "gift_sub", "user": username, "size": recipient_count}}
-        )
+        alert_queue.put({"type": "gift_sub", "user": username, "size": recipient_count})
 
     async def handle_sub_message(self, data: dict):
         """Handle subscription messages (e.g., resubs with a custom message)."""
@@ -212,16 +236,14 @@ class TwitchEventSub:
             f"🎉 {username} resubscribed at {sub_tier} for {cumulative_months} months! Message: {message}"
         )
 
-        # Broadcast to overlay
-        await broadcast_message(
+        # Queue the overlay alert
+        alert_queue.put(
             {
-                "alert": {
-                    "type": "subscription_message",
-                    "user": username,
-                    "tier": sub_tier,
-                    "months": cumulative_months,
-                    "message": message,
-                }
+                "type": "subscription_message",
+                "user": username,
+                "tier": sub_tier,
+                "months": cumulative_months,
+                "message": message,
             }
         )
 
@@ -247,9 +269,7 @@ class TwitchEventSub:
 
         save_event("raid", user_id, f"Raid with {viewer_count} viewers")
 
-        await broadcast_message(
-            {"alert": {"type": "raid", "user": username, "size": viewer_count}}
-        )
+        alert_queue.put({"type": "raid", "user": username, "size": viewer_count})
 
     async def handle_cheer(self, data: dict):
         """Handle Bit cheers."""
@@ -258,9 +278,7 @@ class TwitchEventSub:
         logger.info(f"💎 {username} cheered {bits} bits!")
 
         save_event("cheer", int(data.event.user_id), f"{username} cheered {bits} bits.")
-        await broadcast_message(
-            {"alert": {"type": "cheer", "user": username, "bits": bits}}
-        )
+        alert_queue.put({"type": "cheer", "user": username, "bits": bits})
 
     async def handle_ban(self, data: dict):
         """Handle ban event"""
@@ -302,6 +320,21 @@ class TwitchEventSub:
             {"admin_alert": {"type": "ad_break", "duration": ad_length}}
         )
 
+    async def handle_stream_online(self, data: dict):
+        """Handle stream start by opening a new stream session."""
+        session = stream_session.start_session(data.event.started_at, data.event.id)
+        logger.info(f"🟢 Stream is live! Session: {session['_id']}")
+
+        save_event("stream_online", None, f"Stream started: {session['_id']}")
+
+    async def handle_stream_offline(self, data: dict):
+        """Handle stream end by closing the current stream session."""
+        session = stream_session.end_session()
+        logger.info("🔴 Stream went offline.")
+
+        if session:
+            save_event("stream_offline", None, f"Stream ended: {session['_id']}")
+
     async def handle_automod_action(self, data: dict):
         """Handle AutoMod actions (message hold, potential flags)."""
         logger.info(vars(data.event))
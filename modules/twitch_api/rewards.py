@@ -4,6 +4,9 @@ from twitchAPI.type import CustomRewardRedemptionStatus
 from database.crud.events import save_event
 from database.crud.todos import save_todo
 from modules.websocket_handler import broadcast_message
+from modules.queues.priority_queue import ALERT
+from modules.queues.tasks import PrintCommandTask
+from modules.queues.manager import alert_queue
 
 logger = logging.getLogger("uvicorn.error.twitch_api.rewards")
 
@@ -35,14 +38,15 @@ class TwitchRewards:
 
         if reward_title == "Chatogram":
             await self.event_queue.put(
-                {
-                    "command": "print",
-                    "user_id": user_id,
-                    "user": username,
-                    "message": user_input,
-                    "redeem_id": redeem_id,
-                    "reward_id": reward_id,
-                }
+                PrintCommandTask(
+                    command="print",
+                    user_id=user_id,
+                    user=username,
+                    message=user_input,
+                    redeem_id=redeem_id,
+                    reward_id=reward_id,
+                ),
+                ALERT,
             )
             broadcast = False
 
@@ -78,14 +82,12 @@ class TwitchRewards:
             except Exception as e:
                 logger.error(f"❌ Todo Error: {e}")
 
-        # Broadcast message to overlay/admin panel
+        # Queue the alert for the overlay/admin panel
         if broadcast:
-            await broadcast_message(
+            alert_queue.put(
                 {
-                    "alert": {
-                        "type": "redemption",
-                        "user": username,
-                        "message": f"{reward_title}: {user_input}",
-                    }
+                    "type": "redemption",
+                    "user": username,
+                    "message": f"{reward_title}: {user_input}",
                 }
             )
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import config
+
+logger = logging.getLogger("uvicorn.error.twitch_api.user")
+
+
+class UserCache:
+    """
+    In-memory cache of Twitch users by id.
+
+    Entries live for `ttl` seconds; the least recently used ones are dropped
+    beyond `max_size`. Misses are collected for `batch_window` seconds and
+    resolved with a single `fetch(user_ids)` call (Helix accepts up to 100 ids),
+    and concurrent lookups of the same id share one request. Unknown users are
+    cached as None, so they are not looked up again either.
+    """
+
+    def __init__(
+        self,
+        fetch,
+        ttl: float = config.TWITCH_USER_CACHE_TTL,
+        max_size: int = config.TWITCH_USER_CACHE_SIZE,
+        batch_window: float = config.TWITCH_USER_BATCH_WINDOW,
+        batch_size: int = 100,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_size = max_size
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._flush_handle = None
+
+    def peek(self, user_id: str):
+        """Return a fresh cached user without fetching it, or None."""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, user_id: str, user):
+        self._entries[user_id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_id: str):
+        """Return the user with `user_id` (a dict), or None if it does not exist."""
+        user_id = str(user_id)
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[user_id] = loop.create_future()
+            if len(self._pending) >= self.batch_size:
+                self._flush_now()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush_now)
+
+        return await asyncio.shield(future)
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        asyncio.ensure_future(self._resolve(batch))
+
+    async def _resolve(self, batch: dict):
+        self.requests += 1
+        try:
+            users = await self.fetch(list(batch))
+        except Exception as e:
+            logger.error(f"❌ Failed to look up {len(batch)} Twitch users: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_result(None)
+            return
+
+        for user_id, future in batch.items():
+            user = users.get(user_id)
+            self.put(user_id, user)
+            if not future.done():
+                future.set_result(user)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "requests": self.requests,
+        }
@@ -3,6 +3,7 @@ import aiohttp
 import config
 import datetime
 from database.couchdb_client import couchdb_client
+from modules.twitch_api.user_cache import UserCache
 
 logger = logging.getLogger("uvicorn.error.twitch_api.user")
 
@@ -11,6 +12,25 @@ class TwitchUsers:
     def __init__(self, twitch, test_mode):
         self.twitch = twitch
         self.test_mode = test_mode
+        self.cache = UserCache(self.get_users_by_id)
+
+    async def get_users_by_id(self, user_ids: list):
+        """Look up to 100 users with a single Helix request, keyed by user id."""
+        if self.test_mode:
+            return {
+                user_id: self._mock_get_user_info(f"user{user_id}")
+                for user_id in user_ids
+            }
+
+        return {
+            user.id: {
+                "id": user.id,
+                "login": user.login,
+                "display_name": user.display_name,
+                "profile_image_url": user.profile_image_url,
+            }
+            async for user in self.twitch.get_users(user_ids=user_ids)
+        }
 
     async def get_user_info(self, username: str = None, user_id: str = None):
         """Retrieve Twitch user info, including color & badges, and store it in CouchDB."""
@@ -104,6 +124,16 @@ class TwitchUsers:
 
                     db[viewer_data["_id"]] = viewer_data  # Create new document
 
+                self.cache.put(
+                    user.id,
+                    {
+                        "id": user.id,
+                        "login": user.login,
+                        "display_name": user.display_name,
+                        "profile_image_url": user.profile_image_url,
+                    },
+                )
+
                 return {
                     "id": user.id,
                     "login": user.login,
@@ -13,6 +13,9 @@ from modules.twitch_api import TwitchAPI
 from modules.misc import save_tokens, load_tokens, replace_emotes
 from modules.websocket_handler import broadcast_message
 from modules.chat_commands import handle_command
+from modules.queues.chat_queue import ChatMessageQueue, PRIORITY_NORMAL
+from modules.stream_stats import stream_stats
+from modules.stream_session import stream_session
 
 from database.couchdb_client import couchdb_client
 from database.crud.viewers import save_viewer, update_viewer_stats
@@ -51,6 +54,7 @@ class TwitchChatBot:
         self.token = None
         self.refresh_token = None
         self.is_running = False
+        self.outbox = ChatMessageQueue(self._send_now)
 
     async def authenticate(self):
         """Authenticate with Twitch and retrieve access tokens."""
@@ -124,12 +128,14 @@ class TwitchChatBot:
             global BADGES
             BADGES = await self.twitch_api.users.fetch_badge_data()
 
+            self.outbox.start()
             self.is_running = True
         except Exception as e:
             logger.error(f"❌ Failed to initialize chat bot: {e}")
 
     async def stop(self):
         """Stop the Twitch chat bot."""
+        self.outbox.stop()
         if self.chat:
             self.chat.stop()
             self.is_running = False
@@ -157,7 +163,7 @@ class TwitchChatBot:
         twitch_id = str(event.user.id)  # Ensure Twitch ID is a string
         message = replace_emotes(html.escape(event.text, True), event.emotes)
         message_id = event.id
-        stream_id = datetime.datetime.utcnow().strftime("%Y%m%d")
+        stream_id = stream_session.current_stream_id()
         emotes_used = len(event.emotes) if event.emotes else 0
         is_reply = event.reply_parent_user_id is not None  # Check if message is a reply
         is_first = event.first
@@ -231,6 +237,9 @@ class TwitchChatBot:
 
             # Update viewer stats in CouchDB
             update_viewer_stats(twitch_id, stream_id, message, emotes_used, is_reply)
+            stream_stats.record_message(
+                stream_id, twitch_id, username, emotes_used, is_reply, is_first
+            )
 
             # Prepare message for overlay
             if not message.startswith("!"):
@@ -269,8 +278,8 @@ class TwitchChatBot:
         except Exception as e:
             logger.error(f"❌ Error processing chat message: {e}")
 
-    async def send_message(self, message):
-        """Send a chat message as the bot."""
+    async def send_message(self, message, *, priority=PRIORITY_NORMAL):
+        """Queue a chat message to be sent as the bot within Twitch's rate limits."""
         if not self.chat:
             logger.error("❌ Chat instance is not initialized!")
             return
@@ -279,12 +288,15 @@ class TwitchChatBot:
             logger.error("❌ ChatBot is not running, cannot send message.")
             return
 
-        try:
-            await self.chat.send_message(self.twitch_channel, message)
-            logger.info(f"✅ Bot sent message to chat: {message}")
+        await self.outbox.put(message, priority)
 
-        except Exception as e:
-            logger.error(f"❌ Failed to send chat message: {e}")
+    async def _send_now(self, message):
+        """
+        Send a single chat message immediately. Only used by the outbox, which
+        handles the exception if sending fails.
+        """
+        await self.chat.send_message(self.twitch_channel, message)
+        logger.info(f"✅ Bot sent message to chat: {message}")
 
     async def remove_message_after_delay(self, message_id, delay):
         """Remove message from list after a delay."""
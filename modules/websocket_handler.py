@@ -1,12 +1,16 @@
+import json
 import logging
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List
+from typing import Dict, List, Set
 
 logger = logging.getLogger("uvicorn.error.websocket")
 
 # Keep track of connected clients
 connected_clients: List[WebSocket] = []
 
+# Clients that asked for optional streams, e.g. {"subscribe": "heatmap"}
+subscriptions: Dict[str, Set[WebSocket]] = {}
+
 
 async def broadcast_message(message: dict):
     """
@@ -19,6 +23,35 @@ async def broadcast_message(message: dict):
             logger.error(f"Error sending message: {e}")
 
 
+def get_subscribers(topic: str) -> Set[WebSocket]:
+    return set(subscriptions.get(topic, ()))
+
+
+async def send_to_subscribers(topic: str, message: dict):
+    """Send a message to the clients subscribed to `topic`."""
+    for client in get_subscribers(topic):
+        try:
+            await client.send_json(message)
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+
+
+def handle_client_message(websocket: WebSocket, text: str):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return
+    if isinstance(data, dict) and isinstance(data.get("subscribe"), str):
+        topic = data["subscribe"]
+        subscriptions.setdefault(topic, set()).add(websocket)
+
+
+def disconnect(websocket: WebSocket):
+    connected_clients.remove(websocket)
+    for clients in subscriptions.values():
+        clients.discard(websocket)
+
+
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket connection handler to communicate with the frontend overlay in real time.
@@ -27,10 +60,10 @@ async def websocket_endpoint(websocket: WebSocket):
     connected_clients.append(websocket)
     try:
         while True:
-            await websocket.receive_text()  # Keep WebSocket connection alive
+            handle_client_message(websocket, await websocket.receive_text())
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
-        connected_clients.remove(websocket)
+        disconnect(websocket)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        connected_clients.remove(websocket)
+        disconnect(websocket)
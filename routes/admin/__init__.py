@@ -5,6 +5,8 @@ from .scheduled import router as scheduled_router
 from .twitch import router as twitch_router
 from .viewers import router as viewers_router
 from .stream import router as stream_router
+from .queue import router as queue_router
+from .sequences import router as sequences_router
 
 admin_router = APIRouter(prefix="/admin")
 admin_router.include_router(button_router)
@@ -13,3 +15,5 @@ admin_router.include_router(scheduled_router)
 admin_router.include_router(twitch_router)
 admin_router.include_router(viewers_router)
 admin_router.include_router(stream_router)
+admin_router.include_router(queue_router)
+admin_router.include_router(sequences_router)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+import logging
+
+from modules.queues.event_processor import get_lane_stats
+from modules.heatmap import heatmap
+
+logger = logging.getLogger("uvicorn.error.routes.admin.queue")
+
+router = APIRouter(prefix="/queue", tags=["Event Queue"])
+
+
+@router.get("/metrics")
+async def get_queue_metrics(request: Request):
+    """Return queue depth and wait-time metrics, lanes, alerts and heat clicks."""
+    event_queue = request.app.state.event_queue
+    heat_api = request.app.state.heat_api
+
+    return {
+        "classes": event_queue.metrics(),
+        "lanes": get_lane_stats(),
+        "alerts": request.app.state.alert_queue.stats(),
+        "heatmap": heatmap.stats(),
+        "heat_api": heat_api.stats() if heat_api else None,
+    }
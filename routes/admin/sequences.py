@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse
+import logging
+
+from modules.sequence_runner import (
+    cancel_sequence,
+    get_running_sequences,
+    has_sequence,
+    start_sequence,
+)
+from modules.sequence_trace import get_trace, get_traces, render_flame_html
+
+logger = logging.getLogger("uvicorn.error.routes.admin.sequences")
+
+router = APIRouter(prefix="/sequences", tags=["Sequences"])
+
+
+@router.get("/running")
+async def list_running_sequences():
+    """List all currently running sequences."""
+    return [run.to_dict() for run in get_running_sequences()]
+
+
+@router.post("/{name}/start")
+async def start_sequence_endpoint(
+    request: Request,
+    name: str,
+    data: dict = Body(default={}, embed=True),
+    debounce: float = Body(default=None, embed=True),
+):
+    """
+    Start a sequence without waiting for it to finish. `debounce` delays the
+    start, so repeated clicks only run the sequence once.
+    """
+    if not has_sequence(name):
+        raise HTTPException(status_code=404, detail=f"Sequence '{name}' not found")
+
+    run = start_sequence(name, request.app.state.event_queue, data, debounce)
+    if run is None:
+        return {"status": "ignored", "message": f"Sequence '{name}' is already running"}
+
+    return {"status": "success", "run": run.to_dict()}
+
+
+@router.post("/{name_or_id}/cancel")
+async def cancel_sequence_endpoint(name_or_id: str):
+    """Cancel a run by its id, or all runs of a sequence by name."""
+    runs = cancel_sequence(name_or_id)
+    if not runs:
+        raise HTTPException(status_code=404, detail="No matching running sequence")
+
+    return {"status": "success", "cancelled": [run.id for run in runs]}
+
+
+@router.get("/traces")
+async def list_sequence_traces(
+    name: str = None, format: str = Query("json", pattern="^(json|html)$")
+):
+    """Timing traces of the last sequence runs as JSON or a flame-style HTML view."""
+    traces = get_traces(name)
+
+    if format == "html":
+        return HTMLResponse(render_flame_html(traces))
+    return [trace.to_dict() for trace in traces]
+
+
+@router.get("/traces/{trace_id}")
+async def get_sequence_trace(
+    trace_id: str, format: str = Query("json", pattern="^(json|html)$")
+):
+    """Timing trace of a single sequence run."""
+    trace = get_trace(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+
+    if format == "html":
+        return HTMLResponse(render_flame_html([trace]))
+    return trace.to_dict()
@@ -1,30 +1,22 @@
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse
 import logging
-import re
+
+from modules.hub_filter import get_hub_filter, reload_hub_filter
 
 router = APIRouter(prefix="/hub", tags=["Hub"])
 
 logger = logging.getLogger("uvicorn.error.routes.hub")
 
-REGEX = [
-    r"^(((\W|[pP])(.|r)(r|.)n)|(p.n.{2}|[^cC]r.n))",
-    r"\w*(?:vulva|vagina|pimmel|penis|pensi|fotze|arsch|p*rn|schwanz|titten|\(*.\))\w*",
-    r"\w*(?:hure|nutte|ficken|fick|wichser|blasen|bumsen|bitch|cunt|dildo|anus|scheide)\w*",
-    r"\w*(?:ejakulat|sperma|nackt|brüste|milf|bdsm|fetisch|gangbang|deepthroat)\w*",
-    r"\w*(?:porno|erotik|sextape|sex|dominatrix|bondage|squirt|nippel|masturbation)\w*",
-]
-
 
 @router.get("/{text}", response_class=HTMLResponse)
 def show_hub(text: str):
     """Sanitize and filter inappropriate words from text."""
 
-    for pattern in REGEX:
-        found = re.findall(pattern, text, re.IGNORECASE)
-        if found:
-            logger.warning(f"Pattern found: {found}")
-            text = "Ferdys"
+    found = get_hub_filter().find(text)
+    if found:
+        logger.warning(f"Pattern found: {found}")
+        text = "Ferdys"
 
     html_content = f"""
     <div class="hub">
@@ -32,3 +24,11 @@ def show_hub(text: str):
     </div>
     """
     return HTMLResponse(content=html_content)
+
+
+@router.post("/reload-filter")
+def reload_filter():
+    """Reload the hub word filter from its config file."""
+    if reload_hub_filter():
+        return {"status": "success", "message": "Hub filter reloaded!"}
+    return {"status": "error", "message": "Invalid hub filter, keeping the old one."}
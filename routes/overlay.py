@@ -6,12 +6,13 @@ import logging
 from modules.schemas import OverlayMessage
 from modules import event_handlers
 from modules.websocket_handler import broadcast_message
-from modules.sequence_runner import execute_sequence, reload_sequences, load_sequences
+from modules.sequence_runner import execute_sequence, has_sequence, reload_sequences
 from modules.heat_api import (
     add_clickable_object,
     remove_clickable_object,
     get_clickable_objects,
 )
+from modules.stream_stats import stream_stats
 from database.crud.overlay import get_overlay_data, save_overlay_data
 from database.crud.events import save_event
 
@@ -99,6 +100,12 @@ async def fetch_overlay_data():
     }
 
 
+@router.get("/stream-stats", summary="Fetch chat stats of the current stream")
+async def fetch_stream_stats():
+    """Returns the latest aggregated chat stats for the outro overlay."""
+    return stream_stats.get_snapshot()
+
+
 @router.post("/data")
 async def set_overlay_data(request: Request):
     """Set overlay data"""
@@ -128,9 +135,7 @@ async def trigger_overlay(request: Request):
     event_queue = request.app.state.event_queue
 
     try:
-        ACTION_SEQUENCES = load_sequences()
-
-        if action in ACTION_SEQUENCES:
+        if has_sequence(action):
             # Pass event queue from `app.state`
             await execute_sequence(action, event_queue, data)
         else:
@@ -152,8 +157,7 @@ async def trigger_overlay(request: Request):
 @router.post("/reload-sequences")
 async def reload_sequences_endpoint():
     """Manually reload sequences from YAML file."""
-    await reload_sequences()
-    return {"status": "success", "message": "Sequences reloaded!"}
+    return await reload_sequences()
 
 
 ### Clickable Objects ###
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 import logging
-import config
 from modules.schemas import PrintRequest
+from modules.printer_service import printer_service
 
 router = APIRouter(prefix="/print", tags=["Printer"])
 
@@ -11,56 +11,31 @@ logger = logging.getLogger("uvicorn.error.routes.print")
 @router.post(
     "/",
     summary="Print data to thermal printer",
-    description="Send structured data to the thermal printer for printing.",
-    response_description="Returns a success message when printing is completed.",
+    description="Queue structured data for printing on the thermal printer.",
+    response_description="Returns the id of the queued print job.",
 )
 async def print_data(request: PrintRequest):
     """
     Endpoint to send data to the thermal printer for printing.
-    Validates the printer state and sends the print elements.
+    Returns as soon as the job is queued; see `/print/jobs/{job_id}` for its status.
     """
+    if not printer_service.is_running:
+        raise HTTPException(status_code=503, detail="Printer not available")
 
-    printer_manager = request.app.state.printer
-    obs = request.app.state.obs
+    job = await printer_service.submit(
+        request.print_elements, as_image=request.print_as_image, source="api"
+    )
+    return {"status": "success", "message": "Print job queued", "job_id": job.id}
 
-    if not printer_manager.is_online():
-        printer_manager.reconnect()
-        if not printer_manager.is_online():
-            raise HTTPException(status_code=500, detail="Printer not available")
 
-    try:
-        try:
-            cam_result = await obs.find_scene_item(config.OBS_PRINTER_CAM)
-            for item in cam_result:
-                await obs.set_source_visibility(item["scene"], item["id"], True)
-        except Exception as e:
-            logger.error("Could not activate Printer Camera")
-        if request.print_as_image:
-            # Print a image
-            pimage = await printer_manager.create_image(elements=request.print_elements)
-            printer_manager.printer.image(
-                pimage,
-                high_density_horizontal=True,
-                high_density_vertical=True,
-                impl="bitImageColumn",
-                fragment_height=960,
-                center=True,
-            )
-        else:
-            for element in request.print_elements:
-                if await printer_manager.print_element(element):
-                    printer_manager.newline(1)
-        printer_manager.cut_paper(partial=True)
+@router.get("/jobs", summary="List recent print jobs")
+async def list_print_jobs():
+    return printer_service.list_jobs()
 
-        if printer_manager.connection_type == "cups":
-            printer_manager.printer.close()
-        return {"status": "success", "message": "Print done!"}
-    except Exception as e:
-        logger.error(f"Error during printing: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        try:
-            for item in cam_result:
-                await obs.set_source_visibility(item["scene"], item["id"], False)
-        except Exception as e:
-            logger.error("Could not deactivate Printer Camera")
+
+@router.get("/jobs/{job_id}", summary="Get the status of a print job")
+async def get_print_job(job_id: int):
+    job = printer_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Print job {job_id} not found")
+    return job.to_dict()
@@ -0,0 +1,42 @@
+// heatmap.js
+
+// Draws the click heatmap frames sent by the backend into #heatmapCanvas.
+// Only overlays with that canvas subscribe to the frames.
+
+async function decodeFrame(data) {
+  const bytes = Uint8Array.from(atob(data), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes])
+    .stream()
+    .pipeThrough(new DecompressionStream("deflate"));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+export function subscribeHeatmap(socket) {
+  if (document.getElementById("heatmapCanvas")) {
+    socket.send(JSON.stringify({ subscribe: "heatmap" }));
+  }
+}
+
+export async function updateHeatmap(frame) {
+  const canvas = document.getElementById("heatmapCanvas");
+  if (!canvas) return;
+
+  const ctx = canvas.getContext("2d");
+  if (frame.clear) {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    return;
+  }
+
+  const values = await decodeFrame(frame.data);
+  canvas.width = frame.width;
+  canvas.height = frame.height;
+
+  const image = ctx.createImageData(frame.width, frame.height);
+  values.forEach((value, i) => {
+    image.data[i * 4] = 255;
+    image.data[i * 4 + 1] = 255 - value;
+    image.data[i * 4 + 2] = 0;
+    image.data[i * 4 + 3] = value;
+  });
+  ctx.putImageData(image, 0, 0);
+}
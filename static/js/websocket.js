@@ -19,7 +19,9 @@ import { triggerStarExplosion } from "./modules/stars.js";
 import {
   createClickableElement,
   removeClickableElement,
+  loadClickableObjects,
 } from "./modules/clickables.js";
+import { subscribeHeatmap, updateHeatmap } from "./modules/heatmap.js";
 
 let socket;
 let reconnectAttempts = 0;
@@ -34,6 +36,8 @@ function connectWebSocket() {
     console.log("WebSocket connected!");
     reconnectAttempts = 0; // Reset reconnect attempts
     updateTopBar("message", "Ferdyverse online!");
+    loadClickableObjects(); // Pick up objects restored after a server restart
+    subscribeHeatmap(socket);
   };
 
   // WebSocket message received
@@ -55,6 +59,8 @@ function connectWebSocket() {
       showHTML(data.html.content, data.html.lifetime || 0);
     } else if (data.clickable) {
       handleClickable(data.clickable);
+    } else if (data.heatmap) {
+      updateHeatmap(data.heatmap);
     } else if (data.hidden) {
       handleHiddenItem(data.hidden);
     } else if (data.chat) {
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Heat click path end to end.
+
+Streams clicks from the local Heat API stand-in (tools/heat_server.py) through
+the real `HeatAPIClient` → `process_click` → event queue → `process_heat_click`
+and reports clicks/sec handled and the reaction latency from sending a click
+until its handler finished.
+
+    python -m tools.bench_heat_clicks --rate 500 --count 5000
+    python -m tools.bench_heat_clicks --input clicks.jsonl --speed 4 --objects 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from collections import defaultdict, deque
+from types import SimpleNamespace
+
+# Keep the app from talking to real services while importing it
+os.environ.setdefault("ENABLE_MOCK_API", "true")
+for _module in ("HEAT_API", "PRINTER", "TWITCH", "OBS", "SPOTIFY"):
+    os.environ.setdefault(f"DISABLE_{_module}", "true")
+
+import websockets
+
+import config
+from modules import heat_api
+from modules.queues import event_processor
+from modules.queues.manager import event_queue
+from modules.queues.tasks import HeatClickTask
+from modules.twitch_api.user_cache import UserCache
+from tools.heat_server import HeatServer, random_clicks, recorded_clicks
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def click_key(user_id, x, y):
+    return user_id, x, y
+
+
+def message_key(message: str):
+    """Key of a sent click, computed like `HeatAPIClient.handle_click` does."""
+    data = json.loads(message)
+    return click_key(
+        data["id"],
+        int(float(data["x"]) * config.OVERLAY_WIDTH),
+        int(float(data["y"]) * config.OVERLAY_HEIGHT),
+    )
+
+
+def make_fetch_users(latency: float):
+    async def fetch_users(user_ids):
+        """Stand-in for Helix `get_users`, one request per batch."""
+        await asyncio.sleep(latency)
+        return {
+            user_id: {"id": user_id, "login": f"user{user_id}", "display_name": user_id}
+            for user_id in user_ids
+        }
+
+    return fetch_users
+
+
+def add_objects(count: int, size: int, seed: int):
+    """Register random clickable objects in the hit test index (not persisted)."""
+    rng = random.Random(seed)
+    for index in range(count):
+        heat_api.index_clickable_object(
+            {
+                "object_id": f"bench_{index}",
+                "x": rng.randint(0, config.OVERLAY_WIDTH - size),
+                "y": rng.randint(0, config.OVERLAY_HEIGHT - size),
+                "width": size,
+                "height": size,
+                "z": rng.randint(0, 3),
+            }
+        )
+
+
+async def run(args):
+    sent_at = defaultdict(deque)
+    latencies = []
+    expected_hits = 0
+
+    def on_send(message):
+        nonlocal expected_hits
+        key = message_key(message)
+        sent_at[key].append(time.perf_counter())
+        if heat_api.CLICKABLE_INDEX.hit(key[1], key[2]):
+            expected_hits += 1
+
+    # Time every handled click from the moment it was sent
+    handle_heat_click = event_processor.TASK_HANDLERS[HeatClickTask]
+
+    async def timed_heat_click(app, task):
+        await handle_heat_click(app, task)
+        pending = sent_at.get(click_key(task.user_id, task.x, task.y))
+        if pending:
+            latencies.append(time.perf_counter() - pending.popleft())
+
+    event_processor.TASK_HANDLERS[HeatClickTask] = timed_heat_click
+
+    add_objects(args.objects, args.object_size, args.seed)
+    app = SimpleNamespace(
+        state=SimpleNamespace(
+            event_queue=event_queue,
+            twitch_api=SimpleNamespace(
+                users=SimpleNamespace(
+                    cache=UserCache(make_fetch_users(args.api_latency / 1000))
+                )
+            ),
+            twitch_chat=None,
+            obs=None,
+            printer=None,
+        )
+    )
+    processor = asyncio.create_task(event_processor.process_event_queue(app))
+
+    def make_clicks():
+        if args.input:
+            return recorded_clicks(args.input)
+        return random_clicks(args.count, args.viewers, args.seed)
+
+    server = HeatServer(
+        make_clicks, args.rate, args.speed, on_send=on_send, close_when_done=False
+    )
+    async with websockets.serve(server.serve, "127.0.0.1", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        client = heat_api.HeatAPIClient(app, 0, url=f"ws://127.0.0.1:{port}/channel/0")
+
+        start = time.perf_counter()
+        client.start()
+        await server.finished.wait()
+        sent_done = time.perf_counter()
+
+        # Wait for the clicks still on their way or in the queue
+        deadline = sent_done + args.drain_timeout
+        while len(latencies) < expected_hits and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        finished = time.perf_counter()
+
+        await client.stop()
+
+    processor.cancel()
+    await asyncio.gather(processor, return_exceptions=True)
+
+    handled = [value * 1000 for value in latencies]
+    duration = finished - start
+
+    print("📊 Heat click benchmark results")
+    print(f"   - Clicks sent:      {server.sent}")
+    print(f"   - Clicks received:  {client.clicks}")
+    print(f"   - Object hits:      {len(handled)} of {expected_hits} handled")
+    print(f"   - Target rate:      {args.rate:.1f} clicks/s")
+    print(f"   - Received rate:    {client.clicks / duration:.1f} clicks/s")
+    print(f"   - Handled rate:     {len(handled) / duration:.1f} hits/s")
+    if handled:
+        print(f"   - Latency p50:      {percentile(handled, 50):.2f} ms")
+        print(f"   - Latency p95:      {percentile(handled, 95):.2f} ms")
+        print(f"   - Latency p99:      {percentile(handled, 99):.2f} ms")
+        print(f"   - Latency max:      {max(handled):.2f} ms")
+        print(f"   - Latency mean:     {statistics.fmean(handled):.2f} ms")
+    print(f"   - Drain after last: {(finished - sent_done) * 1000:.2f} ms")
+    print(f"   - User lookups:     {app.state.twitch_api.users.cache.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Heat clicks from WebSocket to handler."
+    )
+    parser.add_argument("--input", help="JSONL file with recorded clicks")
+    parser.add_argument("--rate", type=float, default=200, help="Clicks per second")
+    parser.add_argument(
+        "--speed", type=float, default=1, help="Replay speed of recorded clicks"
+    )
+    parser.add_argument(
+        "--count", type=int, default=2000, help="Random clicks to generate"
+    )
+    parser.add_argument("--viewers", type=int, default=200, help="Distinct viewers")
+    parser.add_argument(
+        "--objects", type=int, default=200, help="Random clickable objects"
+    )
+    parser.add_argument(
+        "--object-size", type=int, default=80, help="Object size in pixels"
+    )
+    parser.add_argument(
+        "--api-latency",
+        type=float,
+        default=50,
+        help="Simulated Helix latency per user lookup request in milliseconds",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=10,
+        help="Seconds to wait for queued clicks after the last one was sent",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(args.log_level)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
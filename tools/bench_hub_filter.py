@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the !hub word filter against the previous regex list.
+
+Includes adversarial inputs (long words, bracket runs) that made the old
+leading-wildcard patterns backtrack quadratically. The default sizes finish
+in a few seconds; `--large` adds inputs the old regex needs minutes for.
+
+    python -m tools.bench_hub_filter
+    python -m tools.bench_hub_filter --large --repeat 1
+    python -m tools.bench_hub_filter --sizes 500 2000 --repeat 3
+"""
+
+import argparse
+import os
+import re
+import time
+
+os.environ.setdefault("ENABLE_MOCK_API", "true")
+
+from modules.hub_filter import load_word_filter
+
+# The filter as it was before the word list moved to storage/hub_filter.json
+LEGACY_REGEX = [
+    r"^(((\W|[pP])(.|r)(r|.)n)|(p.n.{2}|[^cC]r.n))",
+    r"\w*(?:vulva|vagina|pimmel|penis|pensi|fotze|arsch|p*rn|schwanz|titten|\(*.\))\w*",
+    r"\w*(?:hure|nutte|ficken|fick|wichser|blasen|bumsen|bitch|cunt|dildo|anus|scheide)\w*",
+    r"\w*(?:ejakulat|sperma|nackt|brüste|milf|bdsm|fetisch|gangbang|deepthroat)\w*",
+    r"\w*(?:porno|erotik|sextape|sex|dominatrix|bondage|squirt|nippel|masturbation)\w*",
+]
+
+
+def legacy_find(text):
+    found = None
+    for pattern in LEGACY_REGEX:
+        if re.findall(pattern, text, re.IGNORECASE):
+            found = pattern
+    return found
+
+
+INPUTS = {
+    "sentence": lambda n: ("ein ganz normaler satz " * n)[:n],
+    "long word": lambda n: "a" * n,
+    "open brackets": lambda n: "(" * n,
+    "near misses": lambda n: ("vulvpenifotzarsc" * n)[:n],
+    "match at end": lambda n: "a" * (n - 3) + "sex",
+    # "İ".lower() is two characters long, match offsets must still fit
+    "non-ascii": lambda n: "İ" * (n - 3) + "sex",
+}
+
+DEFAULT_SIZES = [100, 250, 500, 1000]
+LARGE_SIZES = [2000, 4000, 8000]
+
+
+def measure(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the !hub word filter.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help=f"also run {LARGE_SIZES} chars (the legacy regex takes minutes)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.large:
+        args.sizes = sorted(set(args.sizes + LARGE_SIZES))
+
+    word_filter = load_word_filter()
+    assert word_filter.find("İİİİsex") == "İİİİsex"
+    assert word_filter.find("Straße ohne SEX") == "SEX"
+
+    print(f"{'input':<15} {'chars':>7} {'legacy ms':>12} {'filter ms':>12}")
+    for name, build in INPUTS.items():
+        for size in args.sizes:
+            text = build(size)
+            legacy = measure(legacy_find, text, args.repeat)
+            current = measure(word_filter.find, text, args.repeat)
+            print(f"{name:<15} {size:>7} {legacy:>12.3f} {current:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
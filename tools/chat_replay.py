@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Replay recorded or synthetic Twitch chat through `TwitchChatBot.on_message`.
+
+Runs the real ingestion path against an in-memory CouchDB stand-in and reports
+receive-to-broadcast latency and how far the pipeline falls behind.
+
+    python -m tools.chat_replay --rate 50 --count 2000
+    python -m tools.chat_replay --input chat.jsonl --rate 200 --db-latency 2
+
+Recorded chat is JSONL, one message per line:
+    {"user": "Name", "user_id": "123", "text": "Hi Kappa",
+     "emotes": {"25": [{"start_position": "3", "end_position": "7"}]},
+     "badges": {"subscriber": "12"}, "reply": false, "first": false}
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+# Keep the app from talking to real services while importing it
+os.environ.setdefault("ENABLE_MOCK_API", "true")
+for _module in ("HEAT_API", "PRINTER", "TWITCH", "OBS", "SPOTIFY"):
+    os.environ.setdefault(f"DISABLE_{_module}", "true")
+
+import config
+from database.couchdb_client import couchdb_client
+from modules import twitch_chat, websocket_handler
+from modules.twitch_chat import TwitchChatBot
+
+EMOTES = {"25": "Kappa", "88": "PogChamp", "354": "4Head", "425618": "LUL"}
+BADGES = {"subscriber/12": "sub", "moderator/1": "mod", "vip/1": "vip"}
+WORDS = (
+    "hallo moin lol gg nice stream was geht heute ab code python bug fix "
+    "deploy overlay printer chatogram raid hype lets go"
+).split()
+
+
+class MemoryDatabase(dict):
+    """Minimal stand-in for a `couchdb.Database` used by the chat path."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def _wait(self):
+        # The real client is blocking, so the stand-in blocks the loop as well
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, doc_id, default=None):
+        self._wait()
+        doc = super().get(doc_id)
+        return dict(doc) if doc is not None else default
+
+    def __getitem__(self, doc_id):
+        self._wait()
+        return dict(super().__getitem__(doc_id))
+
+    def save(self, doc):
+        self._wait()
+        doc.setdefault("_id", uuid.uuid4().hex)
+        super().__setitem__(doc["_id"], dict(doc))
+        return doc["_id"], "1"
+
+
+class MemoryCouchDB:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.databases = {}
+
+    def get_db(self, db_name):
+        if db_name not in self.databases:
+            self.databases[db_name] = MemoryDatabase(self.latency)
+        return self.databases[db_name]
+
+
+class FakeUsers:
+    async def get_user_info(self, username: str = None, user_id: str = None):
+        return {
+            "login": f"user{user_id}",
+            "display_name": f"User{user_id}",
+            "profile_image_url": "",
+            "color": "#9147FF",
+        }
+
+
+class LatencyProbe:
+    """Fake WebSocket client that timestamps every admin chat broadcast."""
+
+    def __init__(self, received_at: dict):
+        self.received_at = received_at
+        self.latencies = []
+
+    async def send_json(self, message: dict):
+        admin_chat = message.get("admin_chat")
+        if admin_chat:
+            started = self.received_at.pop(admin_chat["message_id"], None)
+            if started is not None:
+                self.latencies.append(time.perf_counter() - started)
+
+
+def synthetic_messages(count: int, viewers: int, seed: int):
+    """Generate chat with emotes, badges, replies and first-time chatters."""
+    rng = random.Random(seed)
+    first_seen = set()
+
+    for _ in range(count):
+        user_id = str(rng.randint(1, viewers))
+        words = rng.choices(WORDS, k=rng.randint(1, 15))
+        emotes = {}
+
+        if rng.random() < 0.3:
+            emote_id, emote_name = rng.choice(list(EMOTES.items()))
+            start = len(" ".join(words)) + 1
+            words.append(emote_name)
+            emotes[emote_id] = [
+                {
+                    "start_position": str(start),
+                    "end_position": str(start + len(emote_name) - 1),
+                }
+            ]
+
+        badges = {}
+        if rng.random() < 0.2:
+            badge_set, badge_version = rng.choice(list(BADGES)).split("/")
+            badges[badge_set] = badge_version
+
+        yield {
+            "user": f"User{user_id}",
+            "user_id": user_id,
+            "text": " ".join(words),
+            "emotes": emotes,
+            "badges": badges,
+            "reply": rng.random() < 0.1,
+            "first": user_id not in first_seen,
+        }
+        first_seen.add(user_id)
+
+
+def recorded_messages(path: str):
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def make_event(message: dict):
+    """Build an object that looks like a twitchAPI `ChatMessage` to `on_message`."""
+    user = SimpleNamespace(
+        id=message["user_id"],
+        name=message["user"].lower(),
+        display_name=message["user"],
+        badges=message.get("badges") or {},
+    )
+    return SimpleNamespace(
+        id=uuid.uuid4().hex,
+        text=message["text"],
+        emotes=message.get("emotes") or None,
+        user=user,
+        reply_parent_user_id="1" if message.get("reply") else None,
+        first=message.get("first", False),
+        _parsed={"tags": {"user-id": message["user_id"]}},
+    )
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def replay(args):
+    database = MemoryCouchDB(args.db_latency / 1000)
+    couchdb_client.get_db = database.get_db
+
+    # Known viewers are pre-seeded, first-time chatters are not
+    messages = list(
+        recorded_messages(args.input)
+        if args.input
+        else synthetic_messages(args.count, args.viewers, args.seed)
+    )
+    viewers_db = database.get_db("viewers")
+    for message in messages:
+        if not message.get("first"):
+            dict.__setitem__(
+                viewers_db,
+                message["user_id"],
+                {"_id": message["user_id"], "display_name": message["user"]},
+            )
+
+    twitch_chat.BADGES = {
+        "global": {key: f"/static/badges/{name}.png" for key, name in BADGES.items()},
+        "channel": {},
+    }
+    bot = TwitchChatBot(
+        client_id=config.TWITCH_CLIENT_ID,
+        client_secret=config.TWITCH_CLIENT_SECRET,
+        twitch_channel=config.TWITCH_CHANNEL,
+        twitch_api=SimpleNamespace(users=FakeUsers()),
+    )
+
+    received_at = {}
+    probe = LatencyProbe(received_at)
+    websocket_handler.connected_clients.append(probe)
+
+    tasks = set()
+    dispatch_lag = []
+    max_in_flight = 0
+    interval = 1 / args.rate
+    start = time.perf_counter()
+
+    for index, message in enumerate(messages):
+        target = start + index * interval
+        delay = target - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        dispatch_lag.append(max(0.0, time.perf_counter() - target))
+
+        event = make_event(message)
+        received_at[event.id] = time.perf_counter()
+
+        # twitchAPI fires every chat handler as its own task
+        task = asyncio.create_task(bot.on_message(event))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        max_in_flight = max(max_in_flight, len(tasks))
+
+    sent_done = time.perf_counter()
+    if tasks:
+        await asyncio.gather(*tasks)
+    finished = time.perf_counter()
+
+    websocket_handler.connected_clients.remove(probe)
+    latencies = [value * 1000 for value in probe.latencies]
+
+    print("📊 Chat replay results")
+    print(f"   - Messages:         {len(messages)} ({len(latencies)} broadcast)")
+    print(f"   - Target rate:      {args.rate:.1f} msg/s")
+    print(f"   - Achieved rate:    {len(latencies) / (finished - start):.1f} msg/s")
+    if latencies:
+        print(f"   - Latency p50:      {percentile(latencies, 50):.2f} ms")
+        print(f"   - Latency p95:      {percentile(latencies, 95):.2f} ms")
+        print(f"   - Latency p99:      {percentile(latencies, 99):.2f} ms")
+        print(f"   - Latency max:      {max(latencies):.2f} ms")
+        print(f"   - Latency mean:     {statistics.fmean(latencies):.2f} ms")
+    print(f"   - Dispatch lag max: {max(dispatch_lag, default=0) * 1000:.2f} ms")
+    print(f"   - Max in flight:    {max_in_flight}")
+    print(f"   - Drain after last: {(finished - sent_done) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay chat through TwitchChatBot.on_message and measure latency."
+    )
+    parser.add_argument("--input", help="JSONL file with recorded chat messages")
+    parser.add_argument("--rate", type=float, default=50, help="Messages per second")
+    parser.add_argument(
+        "--count", type=int, default=1000, help="Synthetic messages to generate"
+    )
+    parser.add_argument(
+        "--viewers", type=int, default=200, help="Distinct synthetic chatters"
+    )
+    parser.add_argument(
+        "--db-latency",
+        type=float,
+        default=0,
+        help="Simulated blocking latency per database call in milliseconds",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(args.log_level)
+
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Heat API WebSocket (heat-api.j38.net).
+
+Streams randomized or recorded clicks in the Heat API message format to every
+connected client, so the Heat API client, its reconnects and the click
+pipeline can be exercised without Twitch. With `--drop-after` each connection
+is closed after that many clicks.
+
+    python -m tools.heat_server --port 8765 --rate 20
+    python -m tools.heat_server --input clicks.jsonl --speed 2
+    HEAT_API_URL=ws://localhost:8765/channel/{channel_id} python run.py
+
+Recorded clicks are JSONL, one click per line; `t` is the offset in seconds
+from the first click and optional (clicks are then sent at `--rate`):
+    {"t": 0.42, "id": "123456", "x": 0.5120, "y": 0.3314}
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+import websockets
+
+logger = logging.getLogger("heat_server")
+
+
+def random_clicks(count: int = None, viewers: int = 20, seed: int = None):
+    """
+    Generate clicks of verified viewers plus some anonymous ("A...") and
+    unverified ("U...") ones. Endless if `count` is None.
+    """
+    rng = random.Random(seed)
+    user_ids = [str(100000 + i) for i in range(viewers)] + ["A1b2c3", "U4d5e6"]
+
+    sent = 0
+    while count is None or sent < count:
+        yield {"id": rng.choice(user_ids), "x": rng.random(), "y": rng.random()}
+        sent += 1
+
+
+def recorded_clicks(path: str):
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def click_message(click: dict) -> str:
+    return json.dumps(
+        {
+            "type": "click",
+            "id": click["id"],
+            "x": f"{float(click['x']):.4f}",
+            "y": f"{float(click['y']):.4f}",
+        }
+    )
+
+
+class HeatServer:
+    """
+    Sends the clicks of `make_clicks()` to each connection.
+
+    Clicks with a `t` offset are sent at their recorded time (divided by
+    `speed`), all others at `rate` clicks per second. `on_send(message)` is
+    called right after each click went out, e.g. to measure latency. With
+    `close_when_done=False` the connection stays open after the last click.
+    """
+
+    def __init__(
+        self,
+        make_clicks,
+        rate: float = 5,
+        speed: float = 1,
+        drop_after: int = None,
+        on_send=None,
+        close_when_done: bool = True,
+    ):
+        self.make_clicks = make_clicks
+        self.rate = rate
+        self.speed = speed
+        self.drop_after = drop_after
+        self.on_send = on_send
+        self.close_when_done = close_when_done
+        self.sent = 0
+        self.finished = asyncio.Event()
+
+    async def serve(self, ws):
+        logger.info("🔗 Client connected")
+        await ws.send(json.dumps({"type": "system", "message": "connected"}))
+
+        sent = 0
+        start = time.perf_counter()
+        try:
+            for index, click in enumerate(self.make_clicks()):
+                if self.drop_after is not None and sent >= self.drop_after:
+                    break
+
+                offset = click.get("t")
+                target = start + (
+                    offset / self.speed if offset is not None else index / self.rate
+                )
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                message = click_message(click)
+                await ws.send(message)
+                sent += 1
+                self.sent += 1
+                if self.on_send:
+                    self.on_send(message)
+            else:
+                self.finished.set()
+                if not self.close_when_done:
+                    await ws.wait_closed()
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+        logger.info(f"🔌 Closing connection after {sent} clicks")
+        await ws.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--input", help="JSONL file with recorded clicks")
+    parser.add_argument("--rate", type=float, default=5, help="clicks per second")
+    parser.add_argument(
+        "--speed", type=float, default=1, help="replay speed of recorded clicks"
+    )
+    parser.add_argument(
+        "--count", type=int, help="random clicks per connection (default: endless)"
+    )
+    parser.add_argument("--viewers", type=int, default=20, help="distinct viewers")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--drop-after", type=int, help="close each connection after this many clicks"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    def make_clicks():
+        if args.input:
+            return recorded_clicks(args.input)
+        return random_clicks(args.count, args.viewers, args.seed)
+
+    server = HeatServer(make_clicks, args.rate, args.speed, args.drop_after)
+    async with websockets.serve(server.serve, args.host, args.port):
+        logger.info(f"🚀 Heat API stand-in on ws://{args.host}:{args.port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass